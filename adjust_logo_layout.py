@@ -28,12 +28,7 @@ import math
 import argparse
 import xml.etree.ElementTree as ET
 
-# -------------- CairoSVG --------------
-try:
-    import cairosvg
-except ImportError:
-    print("❌ Error: cairosvg library not found!\nPlease install it: pip install cairosvg")
-    sys.exit(1)
+from imaging.svg import render_svg
 
 SVG_NS = "http://www.w3.org/2000/svg"
 NS = {"svg": SVG_NS}
@@ -180,15 +175,12 @@ def _infer_png_size(svg_path, png_width=None, png_height=None, scale=None):
 # --------- Convert to PNG (High-Res) ---------
 def convert_svg_to_png(svg_path, png_path, png_width=None, png_height=None, scale=5.0, dpi=300):
     try:
-        with open(svg_path, "rb") as f:
-            svg_bytes = f.read()
-
         sizing = _infer_png_size(svg_path, png_width=png_width, png_height=png_height, scale=scale)
 
-        kwargs = dict(bytestring=svg_bytes, write_to=png_path, dpi=dpi)
+        kwargs = dict(dpi=dpi)
         kwargs.update(sizing)  # either output_width/height or scale
 
-        cairosvg.svg2png(**kwargs)
+        render_svg(svg_path, png_path, **kwargs)
         print(f"✅ Converted: {svg_path} -> {png_path} ({'x'.join(str(v) for v in sizing.values())})")
         return True
     except Exception as e:
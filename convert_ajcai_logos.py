@@ -4,35 +4,15 @@ Convert AJCAI 2025 SVG logos to PNG format
 """
 
 import os
-import sys
-from pathlib import Path
 
-try:
-    import cairosvg
-except ImportError:
-    print("❌ Error: cairosvg library not found!")
-    print("Please install it using: pip install cairosvg")
-    sys.exit(1)
+from imaging import svg
+from imaging.svg import require_cairosvg
+
 
 def convert_svg_to_png(svg_path, png_path, width=600, height=160, dpi=300):
     """Convert SVG to PNG with specified dimensions"""
-    try:
-        with open(svg_path, 'r', encoding='utf-8') as f:
-            svg_content = f.read()
-        
-        cairosvg.svg2png(
-            bytestring=svg_content,
-            write_to=png_path,
-            output_width=width,
-            output_height=height,
-            dpi=dpi
-        )
-        print(f"✅ Converted: {svg_path} -> {png_path}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error converting {svg_path}: {str(e)}")
-        return False
+    return svg.convert_svg_to_png(svg_path, png_path, width=width, height=height, dpi=dpi)
+
 
 def main():
     # List of SVG files to convert
@@ -54,6 +34,10 @@ def main():
     input_dir = "imgs"
     output_dir = "imgs"
     
+    try:
+        require_cairosvg()
+    except ImportError as exc:
+        raise SystemExit(f"❌ Error: {exc}")
     print("🎨 Converting AJCAI 2025 SVG logos to PNG...")
     print(f"📁 Input directory: {input_dir}")
     print(f"📁 Output directory: {output_dir}")
@@ -8,12 +8,20 @@ import numpy as np
 import base64
 import io
 
-def create_gradient_logo():
+from imaging.trace import span
+
+# The "logo" master of data/tshirt_palettes.json; the black-soft and other colorways are generated from it,
+# so run `python -m imaging colorways` afterwards to carry the embedded logo into them.
+MASTER_SVG = "imgs/tshirt/master/logo.svg"
+
+def create_gradient_logo(source="imgs/logo.png"):
     """Create a gradient version of the logo with design colors"""
     
     # Load the original logo
     try:
-        original_logo = Image.open("imgs/logo.png")
+        with span("decode"):
+            original_logo = Image.open(source)
+            original_logo.load()
         print(f"Original logo loaded: {original_logo.size}")
     except Exception as e:
         print(f"Error loading logo: {e}")
@@ -23,9 +31,6 @@ def create_gradient_logo():
     if original_logo.mode != 'RGBA':
         original_logo = original_logo.convert('RGBA')
     
-    # Create a new image with the same size
-    new_logo = Image.new('RGBA', original_logo.size, (0, 0, 0, 0))
-    
     # Get image data
     img_array = np.array(original_logo)
     
@@ -33,57 +38,38 @@ def create_gradient_logo():
     main_purple = np.array([81, 36, 122, 255])  # #51247A
     anu_gold = np.array([191, 135, 43, 255])    # #BF872B
     
-    # Create gradient effect
+    # Gradient from left to right, one colour per column (same float maths as the per-pixel version)
     width, height = original_logo.size
-    
-    for y in range(height):
-        for x in range(width):
-            pixel = img_array[y, x]
-            
-            # If pixel is white (original text/pattern)
-            if pixel[0] > 200 and pixel[1] > 200 and pixel[2] > 200 and pixel[3] > 200:
-                # Create gradient from left to right
-                gradient_ratio = x / width
-                
-                # Interpolate between purple and gold
-                new_color = main_purple * (1 - gradient_ratio) + anu_gold * gradient_ratio
-                new_color = new_color.astype(np.uint8)
-                
-                # Keep original alpha
-                new_color[3] = pixel[3]
-                new_logo.putpixel((x, y), tuple(new_color))
-            
-            # If pixel is light gray (texture)
-            elif pixel[0] > 150 and pixel[1] > 150 and pixel[2] > 150 and pixel[3] > 200:
-                # Use a lighter version of the gradient
-                gradient_ratio = x / width
-                light_purple = main_purple * 0.7
-                light_gold = anu_gold * 0.7
-                new_color = light_purple * (1 - gradient_ratio) + light_gold * gradient_ratio
-                new_color = new_color.astype(np.uint8)
-                new_color[3] = pixel[3]
-                new_logo.putpixel((x, y), tuple(new_color))
-            
-            # If pixel is dark (outlines)
-            elif pixel[0] < 100 and pixel[1] < 100 and pixel[2] < 100 and pixel[3] > 200:
-                # Use dark purple for outlines
-                new_logo.putpixel((x, y), (40, 20, 60, pixel[3]))
-            
-            else:
-                # Keep other pixels as is
-                new_logo.putpixel((x, y), tuple(pixel))
-    
+    gradient_ratio = (np.arange(width) / width)[None, :, None]
+    gradient = (main_purple * (1 - gradient_ratio) + anu_gold * gradient_ratio).astype(np.uint8)
+    light_gradient = (main_purple * 0.7 * (1 - gradient_ratio) + anu_gold * 0.7 * gradient_ratio).astype(np.uint8)
+    
+    with span("recolor"):
+        rgb, alpha = img_array[..., :3], img_array[..., 3]
+        opaque = alpha > 200
+        white = opaque & (rgb > 200).all(axis=2)                # original text/pattern
+        light_gray = opaque & (rgb > 150).all(axis=2) & ~white  # texture
+        dark = opaque & (rgb < 100).all(axis=2)                 # outlines
+        
+        # Keep other pixels as is; every branch keeps the original alpha
+        result = img_array.copy()
+        result[..., :3] = np.where(white[..., None], gradient[..., :3], result[..., :3])
+        result[..., :3] = np.where(light_gray[..., None], light_gradient[..., :3], result[..., :3])
+        result[dark, :3] = (40, 20, 60)  # dark purple for outlines
+    
+    new_logo = Image.fromarray(result, 'RGBA')
     return new_logo
 
 def logo_to_base64(image):
     """Convert PIL image to base64 string"""
     buffer = io.BytesIO()
-    image.save(buffer, format='PNG')
+    with span("encode"):
+        image.save(buffer, format='PNG')
     img_str = base64.b64encode(buffer.getvalue()).decode()
     return img_str
 
 def update_svg_with_logo():
-    """Update the SVG file with the new gradient logo"""
+    """Embed the new gradient logo in the master SVG the colorways are generated from"""
     
     # Create gradient logo
     gradient_logo = create_gradient_logo()
@@ -91,7 +77,8 @@ def update_svg_with_logo():
         return False
     
     # Save the gradient logo
-    gradient_logo.save("imgs/logo-gradient.png")
+    with span("encode"):
+        gradient_logo.save("imgs/logo-gradient.png")
     print("Gradient logo saved as logo-gradient.png")
     
     # Convert to base64
@@ -99,7 +86,7 @@ def update_svg_with_logo():
     
     # Read the SVG file
     try:
-        with open("imgs/tshirt/ajcai2025-logo-tshirt-black-soft.svg", "r") as f:
+        with open(MASTER_SVG, "r") as f:
             svg_content = f.read()
     except Exception as e:
         print(f"Error reading SVG: {e}")
@@ -143,18 +130,21 @@ def update_svg_with_logo():
     
     # Write back to SVG file
     try:
-        with open("imgs/tshirt/ajcai2025-logo-tshirt-black-soft.svg", "w") as f:
+        with open(MASTER_SVG, "w") as f:
             f.write(svg_content)
-        print("SVG file updated successfully!")
+        print(f"{MASTER_SVG} updated; run `python -m imaging colorways` to regenerate the colorways.")
         return True
     except Exception as e:
         print(f"Error writing SVG: {e}")
         return False
 
-if __name__ == "__main__":
+def main():
     print("Converting logo colors and updating SVG...")
     success = update_svg_with_logo()
     if success:
-        print("✅ All done! Check the updated SVG file.")
+        print("✅ All done! Check the updated master SVG.")
     else:
         print("❌ Something went wrong.")
+
+if __name__ == "__main__":
+    main()
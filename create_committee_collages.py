@@ -1,31 +1,41 @@
-"""Generate three collage images for the 36 committee members with names, affiliations, and chair roles."""
+"""Generate three collage images for the 36 committee members with names, affiliations, and chair roles.
 
+`--wall` instead renders the whole roster (data/committee.json, or the cards on committee.html with
+`--roster committee.html`) as one image, composited and PNG-encoded one row of cells at a time so memory
+stays bounded by a single row however many people are on the wall.
+"""
+
+import argparse
+import re
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageFont
+
+from imaging import ROOT
+from imaging.cells import fit_cell
+from imaging.data import CellCache, fingerprint, load_roster
+from imaging.fonts import font_try_load
+from imaging.grid import cell_origin, grid_size, row_count
+from imaging.pipeline import prefetch
+from imaging.png import PNGStreamWriter
+from imaging.text import draw_lines, font_key, layout_lines
+from imaging.trace import span
 
-from PIL import Image, ImageDraw, ImageFont, ImageOps
 
+# Fonts load on first use so importing this module (e.g. for `python -m imaging --help`) stays cheap.
+def name_font() -> ImageFont.FreeTypeFont:
+    return font_try_load(32, bold=True)
 
-ROOT = Path(__file__).parent
 
+def role_font() -> ImageFont.FreeTypeFont:
+    return font_try_load(24, bold=True)
 
-def font_try_load(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
-    """Load a readable font, falling back to Pillow's default."""
-    candidates = [
-        "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf",
-        "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf",
-    ]
-    for path in candidates:
-        try:
-            return ImageFont.truetype(path, size)
-        except OSError:
-            continue
-    return ImageFont.load_default()
 
+def info_font() -> ImageFont.FreeTypeFont:
+    return font_try_load(24, bold=False)
 
-NAME_FONT = font_try_load(32, bold=True)
-ROLE_FONT = font_try_load(24, bold=True)
-INFO_FONT = font_try_load(24, bold=False)
 
 # Layout settings.
 COLUMN_COUNT = 6  # 6 per row
@@ -41,46 +51,81 @@ ROLE_COLOR = (81, 36, 122, 255)  # main purple
 
 
 Person = dict
-
-# Data in display order.
-PEOPLE: List[Person] = [
-    {"name": "Stephen Gould", "affiliation": "Australian National University, Australia", "role": "General Chair", "image": ROOT / "imgs/portraits/stephen_gould.jpg"},
-    {"name": "Guodong Long", "affiliation": "University of Technology Sydney, Australia", "role": "General Chair", "image": ROOT / "imgs/portraits/guodong_long.jpeg"},
-    {"name": "Helen Huang", "affiliation": "The University of Queensland, Australia", "role": "General Chair", "image": ROOT / "imgs/portraits/helen_huang.jpg"},
-    {"name": "Miaomiao Liu", "affiliation": "The Australian National University, Australia", "role": "Program Chair", "image": ROOT / "imgs/portraits/miaomiao_liu.jpg"},
-    {"name": "Xin Yu", "affiliation": "University of Adelaide, Australia", "role": "Program Chair", "image": ROOT / "imgs/portraits/xin_yu.png"},
-    {"name": "Dylan Campbell", "affiliation": "The Australian National University, Australia", "role": "Local Arrangement Chair", "image": ROOT / "imgs/portraits/dylan_campbell.jpg"},
-    {"name": "Yiliao Song", "affiliation": "University of Adelaide, Australia", "role": "Publication Chair", "image": ROOT / "imgs/portraits/yiliao_song.png.jpg"},
-    {"name": "Chang Xu", "affiliation": "The University of Sydney, Australia", "role": "Publication Chair", "image": ROOT / "imgs/portraits/chang_xu.png"},
-    {"name": "Yanbin Liu", "affiliation": "Auckland University of Technology, New Zealand", "role": "Workshop/Tutorial Chair", "image": ROOT / "imgs/portraits/yanbin_liu.jpg"},
-    {"name": "Zhen Fang", "affiliation": "University of Technology Sydney, Australia", "role": "Workshop/Tutorial Chair", "image": ROOT / "imgs/portraits/zhen_fang.jpeg"},
-    {"name": "Ibrahim Radwan", "affiliation": "University of Canberra, Australia", "role": "Workshop/Tutorial Chair", "image": ROOT / "imgs/portraits/ibrahim.jpg.webp"},
-    {"name": "Charles Gretton", "affiliation": "Australian National University, Australia", "role": "Industrial Session Chair", "image": ROOT / "imgs/portraits/charles_gretton.png.jpg"},
-    {"name": "Wei Zhang", "affiliation": "University of Adelaide, Australia", "role": "Industrial Session Chair", "image": ROOT / "imgs/portraits/wei_zhang.jpeg"},
-    {"name": "Peike Li", "affiliation": "Google Research, Australia", "role": "Industrial Session Chair", "image": ROOT / "imgs/peikeli.jpeg"},
-    {"name": "Zongyuan Ge", "affiliation": "Monash University, Australia", "role": "Sponsorship Chair", "image": ROOT / "imgs/portraits/Zongyuan_ge.JPG"},
-    {"name": "Tongliang Liu", "affiliation": "The University of Sydney, Australia", "role": "Sponsorship Chair", "image": ROOT / "imgs/portraits/Tongliang-Liu.jpg"},
-    {"name": "Dadong Wang", "affiliation": "Data61, CSIRO, Australia", "role": "Sponsorship Chair", "image": ROOT / "imgs/portraits/dadong_wang.jpg"},
-    {"name": "Ms Linda ANU", "affiliation": "Australian National University, Australia", "role": "Finance Chair", "image": ROOT / "imgs/anonymous.png"},
-    {"name": "Heming Du", "affiliation": "The University of Queensland, Australia", "role": "Registration Chair", "image": ROOT / "imgs/portraits/heming_du.jpg"},
-    {"name": "Jackie Rong", "affiliation": "Monash University, Australia", "role": "Registration Chair", "image": ROOT / "imgs/portraits/jackie_rong.png"},
-    {"name": "Feng Liu", "affiliation": "The University of Melbourne, Australia", "role": "Publicity Chair", "image": ROOT / "imgs/portraits/feng_liu.jpeg"},
-    {"name": "Jing Zhang", "affiliation": "Australian National University, Australia", "role": "Publicity Chair", "image": ROOT / "imgs/portraits/jing_zhang.jpg"},
-    {"name": "Yujiao Shi", "affiliation": "ShanghaiTech University, China", "role": "Publicity Chair", "image": ROOT / "imgs/portraits/yujiao_shi.jpg"},
-    {"name": "Shunli Zhang", "affiliation": "Beijing Jiaotong University, China", "role": "Publicity Chair", "image": ROOT / "imgs/portraits/shunli_zhang.jpg"},
-    {"name": "Kee Siong Ng", "affiliation": "ANU & Australian Government, Australia", "role": "AI for Government Chair", "image": ROOT / "imgs/portraits/Kee_Siong_Ng_CECS_web-9187.jpg"},
-    {"name": "Xun Li", "affiliation": "Data61, CSIRO, Australia", "role": "AI for Government Chair", "image": ROOT / "imgs/portraits/xun_li.jpeg"},
-    {"name": "Miao Xu", "affiliation": "The University of Queensland, Australia", "role": "Inclusive AI Chair", "image": ROOT / "imgs/portraits/miao_xu.jpeg"},
-    {"name": "Alina Bialkowski", "affiliation": "The University of Queensland, Australia", "role": "Inclusive AI Chair", "image": ROOT / "imgs/portraits/alina_bialkowski.jpeg"},
-    {"name": "Andy Song", "affiliation": "RMIT University, Australia", "role": "ACS Liaison Chair", "image": ROOT / "imgs/portraits/andy_song.jpeg"},
-    {"name": "Pascal Bercher", "affiliation": "Australian National University, Australia", "role": "PhD Forum Chair", "image": ROOT / "imgs/portraits/pascal-bercher.jpg"},
-    {"name": "Russell Tsuchida", "affiliation": "Monash University, Australia", "role": "PhD Forum Chair", "image": ROOT / "imgs/portraits/russell.jpeg.webp"},
-    {"name": "Chen Liu", "affiliation": "The University of Queensland, Australia", "role": "PhD Forum Chair", "image": ROOT / "imgs/portraits/Chen_Liu.jpeg"},
-    {"name": "Yu Yao", "affiliation": "The University of Sydney, Australia", "role": "Encore Track Chair", "image": ROOT / "imgs/yu yao.png"},
-    {"name": "Felipe Trevizan", "affiliation": "Australian National University, Australia", "role": "Encore Track Chair", "image": ROOT / "imgs/felipe-trevizan.jpg"},
-    {"name": "Ruihan Lu", "affiliation": "The University of Queensland, Australia", "role": "Website Chair", "image": ROOT / "imgs/portraits/ruihan_lu.jpg"},
-    {"name": "Jiaying Ying", "affiliation": "The University of Queensland, Australia", "role": "Website Chair", "image": ROOT / "imgs/image0.png"},
-]
+# What a loader thread hands back for one person: (cache key, cached cell or None, headshot or None).
+Loaded = Tuple[str, Optional[Image.Image], Optional[Image.Image]]
+
+# Data in display order, loaded from data/committee.json.
+PEOPLE: List[Person] = load_roster("committee")
+
+CELL_CACHE = CellCache("committee")
+
+
+class CommitteePageParser(HTMLParser):
+    """Collect the person cards from committee.html: each section's <h2> gives the role of the cards below it.
+
+    Commented-out cards are skipped for free, since the parser reports comments separately.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.people: List[Person] = []
+        self._role = ""
+        self._in_heading = False
+        self._card: Optional[Dict[str, object]] = None
+        self._paragraph: Optional[List[str]] = None
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        attributes = dict(attrs)
+        if tag == "h2":
+            self._in_heading = True
+            self._role = ""
+        elif tag == "a" and "flex-col" in (attributes.get("class") or ""):
+            self._card = {"image": None, "lines": []}
+        elif self._card is not None and tag == "img":
+            src = attributes.get("src") or ""
+            if src and not src.startswith("data:"):
+                self._card["image"] = ROOT / src.removeprefix("./")
+        elif self._card is not None and tag == "p":
+            self._paragraph = [""]
+        elif self._paragraph is not None and tag == "br":
+            self._paragraph.append("")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "h2":
+            self._in_heading = False
+        elif tag == "p" and self._paragraph is not None:
+            self._card["lines"].append([" ".join(part.split()) for part in self._paragraph if part.strip()])
+            self._paragraph = None
+        elif tag == "a" and self._card is not None:
+            lines = self._card["lines"]
+            if self._card["image"] and len(lines) >= 2 and lines[0]:
+                # Names are written "Title<br>Given Family"; the roster keeps only the name.
+                self.people.append(
+                    {
+                        "name": lines[0][-1],
+                        "role": re.sub(r"\bChairs\b", "Chair", self._role),
+                        "affiliation": " ".join(lines[1]),
+                        "image": self._card["image"],
+                    }
+                )
+            self._card = None
+
+    def handle_data(self, data: str) -> None:
+        if self._in_heading:
+            self._role = " ".join(f"{self._role} {data}".split())
+        elif self._paragraph is not None:
+            self._paragraph[-1] += data
+
+
+def load_people(roster: Optional[Path]) -> List[Person]:
+    """The default roster, a JSON file in data/committee.json's format, or the cards on an HTML page."""
+    if roster is None:
+        return PEOPLE
+    if roster.suffix.lower() in (".html", ".htm"):
+        parser = CommitteePageParser()
+        parser.feed(roster.read_text(encoding="utf-8"))
+        return parser.people
+    return load_roster(roster)
 
 
 def chunk(items: Sequence[Person], size: int) -> Iterable[Sequence[Person]]:
@@ -88,90 +133,137 @@ def chunk(items: Sequence[Person], size: int) -> Iterable[Sequence[Person]]:
         yield items[start : start + size]
 
 
-def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> List[str]:
-    words = text.split()
-    lines: List[str] = []
-    current = ""
-    for word in words:
-        trial = (current + " " + word).strip()
-        if font.getlength(trial) <= max_width:
-            current = trial
-        else:
-            if current:
-                lines.append(current)
-            current = word
-    if current:
-        lines.append(current)
-    return lines
-
-
 def prepare_headshot(image_path: Path) -> Image.Image:
-    with Image.open(image_path) as img:
-        img = img.convert("RGBA")
-        fitted = ImageOps.fit(img, HEADSHOT_SIZE, method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
-    cell = Image.new("RGBA", HEADSHOT_SIZE, (0, 0, 0, 0))
-    cell.paste(fitted, (0, 0), mask=fitted)
-    return cell
+    return fit_cell(image_path, HEADSHOT_SIZE)
 
 
-def draw_person(canvas: Image.Image, person: Person, origin: tuple[int, int]) -> None:
+def draw_person(canvas: Image.Image, person: Person, origin: tuple[int, int], headshot: Optional[Image.Image] = None) -> None:
     x0, y0 = origin
-    draw = ImageDraw.Draw(canvas)
 
-    headshot = prepare_headshot(person["image"])
+    if headshot is None:
+        headshot = prepare_headshot(person["image"])
     headshot_x = x0 + (CELL_SIZE[0] - HEADSHOT_SIZE[0]) // 2
-    canvas.paste(headshot, (headshot_x, y0), mask=headshot)
+    with span("paste"):
+        canvas.paste(headshot, (headshot_x, y0), mask=headshot)
 
     cursor_y = y0 + HEADSHOT_SIZE[1] + 14
     text_max_width = CELL_SIZE[0] - 20
+    box = (x0, CELL_SIZE[0])
+    name, role, info = name_font(), role_font(), info_font()
+
+    name_lines = layout_lines(person["name"], name, text_max_width)
+    role_lines = layout_lines(person["role"], role, text_max_width)
+    affil_lines = layout_lines(person["affiliation"], info, text_max_width)
+
+    cursor_y = draw_lines(canvas, name_lines, name, box, cursor_y, TEXT_COLOR, name.size + 4)
+    cursor_y = draw_lines(canvas, role_lines, role, box, cursor_y + 2, ROLE_COLOR, role.size + 2)
+    draw_lines(canvas, affil_lines, info, box, cursor_y + 2, TEXT_COLOR, info.size + 2)
 
-    name_lines = wrap_text(person["name"], NAME_FONT, text_max_width)
-    role_lines = wrap_text(person["role"], ROLE_FONT, text_max_width)
-    affil_lines = wrap_text(person["affiliation"], INFO_FONT, text_max_width)
 
-    for line in name_lines:
-        text_width = NAME_FONT.getlength(line)
-        draw.text((x0 + (CELL_SIZE[0] - text_width) / 2, cursor_y), line, font=NAME_FONT, fill=TEXT_COLOR)
-        cursor_y += NAME_FONT.size + 4
+def person_fingerprint(person: Person) -> str:
+    fonts = [font_key(font) for font in (name_font(), role_font(), info_font())]
+    layout = [CELL_SIZE, HEADSHOT_SIZE, BACKGROUND, TEXT_COLOR, ROLE_COLOR, fonts]
+    return fingerprint("committee", person["name"], person["role"], person["affiliation"], person["image"], layout)
 
-    cursor_y += 2
-    for line in role_lines:
-        text_width = ROLE_FONT.getlength(line)
-        draw.text((x0 + (CELL_SIZE[0] - text_width) / 2, cursor_y), line, font=ROLE_FONT, fill=ROLE_COLOR)
-        cursor_y += ROLE_FONT.size + 2
 
-    cursor_y += 2
-    for line in affil_lines:
-        text_width = INFO_FONT.getlength(line)
-        draw.text((x0 + (CELL_SIZE[0] - text_width) / 2, cursor_y), line, font=INFO_FONT, fill=TEXT_COLOR)
-        cursor_y += INFO_FONT.size + 2
+def load_person(person: Person) -> Loaded:
+    """The loader-thread half of `render_person`: the cached cell, or else the decoded headshot to draw on."""
+    key = person_fingerprint(person)
+    cell = CELL_CACHE.get(key)
+    return key, cell, prepare_headshot(person["image"]) if cell is None else None
+
+
+def render_person(person: Person, loaded: Optional[Loaded] = None) -> Image.Image:
+    """Render one person into a standalone cell, reusing the cached render when nothing has changed.
+
+    `loaded` is `load_person(person)` when a loader thread has already done the decoding. Text is always
+    drawn on the calling thread, since the shared FreeType faces are not safe to use from several at once.
+    """
+    key, cell, headshot = loaded if loaded is not None else load_person(person)
+    if cell is None:
+        cell = Image.new("RGBA", CELL_SIZE, BACKGROUND)
+        draw_person(cell, person, (0, 0), headshot)
+        CELL_CACHE.put(key, cell)
+    return cell
 
 
 def build_page(page_people: Sequence[Person], page_index: int, output_dir: Path) -> Path:
-    width = COLUMN_COUNT * CELL_SIZE[0] + (COLUMN_COUNT + 1) * PADDING_X
-    height = ROWS_PER_PAGE * CELL_SIZE[1] + (ROWS_PER_PAGE + 1) * PADDING_Y
-    canvas = Image.new("RGBA", (width, height), BACKGROUND)
+    size = grid_size(ROWS_PER_PAGE, COLUMN_COUNT, CELL_SIZE, PADDING_X, PADDING_Y)
+    canvas = Image.new("RGBA", size, BACKGROUND)
 
-    for idx, person in enumerate(page_people):
-        row, col = divmod(idx, COLUMN_COUNT)
-        x = PADDING_X + col * (CELL_SIZE[0] + PADDING_X)
-        y = PADDING_Y + row * (CELL_SIZE[1] + PADDING_Y)
-        draw_person(canvas, person, (x, y))
+    for idx, (person, loaded) in enumerate(zip(page_people, prefetch(load_person, page_people))):
+        x, y = cell_origin(idx, COLUMN_COUNT, CELL_SIZE, PADDING_X, PADDING_Y)
+        cell = render_person(person, loaded)
+        # Cells never overlap and the canvas is transparent, so a plain paste matches drawing in place.
+        with span("paste"):
+            canvas.paste(cell, (x, y))
 
     output_path = output_dir / f"committee_collage_{page_index + 1}.png"
-    canvas.save(output_path)
+    with span("encode", file=output_path.name):
+        canvas.save(output_path)
     return output_path
 
 
-def build_all(output_dir: Path = ROOT / "imgs") -> List[Path]:
+def build_wall(people: Sequence[Person], output_path: Path, columns: int = COLUMN_COUNT) -> Path:
+    """Render every person onto one image, streaming it to disk one row band at a time.
+
+    Each band is the padding above a row plus the row of cells, so only one band, one cell and the
+    bounded read-ahead of headshots are in memory at once; the pixels match a full-canvas `build_page`
+    layout of the same grid.
+    """
+    rows = row_count(len(people), columns)
+    size = grid_size(rows, columns, CELL_SIZE, PADDING_X, PADDING_Y)
+    band_height = PADDING_Y + CELL_SIZE[1]
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    loads = prefetch(load_person, people)
+    with PNGStreamWriter(output_path, size) as png:
+        for row, row_people in enumerate(chunk(people, columns)):
+            with span(f"row {row + 1}", cat="build"):
+                band = Image.new("RGBA", (size[0], band_height), BACKGROUND)
+                for col, person in enumerate(row_people):
+                    x, _ = cell_origin(col, columns, CELL_SIZE, PADDING_X, PADDING_Y)
+                    cell = render_person(person, next(loads))
+                    with span("paste"):
+                        band.paste(cell, (x, PADDING_Y))
+                png.write(band)
+                del band
+        png.write_blank(PADDING_Y, BACKGROUND)
+    return output_path
+
+
+def build_all(people: Sequence[Person] = PEOPLE, output_dir: Path = ROOT / "imgs") -> List[Path]:
     output_dir.mkdir(parents=True, exist_ok=True)
     outputs: List[Path] = []
-    for page_index, page_people in enumerate(chunk(PEOPLE, PEOPLE_PER_PAGE)):
-        outputs.append(build_page(page_people, page_index, output_dir))
+    for page_index, page_people in enumerate(chunk(people, PEOPLE_PER_PAGE)):
+        with span(f"page {page_index + 1}", cat="build"):
+            outputs.append(build_page(page_people, page_index, output_dir))
     return outputs
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--wall",
+        nargs="?",
+        type=Path,
+        const=ROOT / "imgs" / "committee_wall.png",
+        metavar="OUT.png",
+        help="render the whole roster as one streamed image (default: imgs/committee_wall.png)",
+    )
+    parser.add_argument("--roster", type=Path, help="roster JSON or committee HTML page (default: data/committee.json)")
+    parser.add_argument("--columns", type=int, default=COLUMN_COUNT, help="cells per row on the wall")
+    args = parser.parse_args()
+
+    people = load_people(args.roster)
+    if args.wall:
+        path = build_wall(people, args.wall, args.columns)
+        print(f"Saved {path} ({len(people)} people, {row_count(len(people), args.columns)} rows)")
+    else:
+        for path in build_all(people):
+            print(f"Saved {path}")
+    print(f"Cells: {CELL_CACHE.summary()}")
+
+
 if __name__ == "__main__":
-    paths = build_all()
-    for path in paths:
-        print(f"Saved {path}")
+    main()
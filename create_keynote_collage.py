@@ -2,20 +2,19 @@
 
 from pathlib import Path
 
-from PIL import Image, ImageOps
+from PIL import Image
 
+from imaging import ROOT
+from imaging.cells import fit_cell
+from imaging.data import CellCache, fingerprint, load_roster
+from imaging.grid import cell_origin, grid_size, row_count
+from imaging.pipeline import prefetch
+from imaging.trace import span
 
-# Source images in display order (left-to-right, top-to-bottom).
-KEYNOTE_IMAGES = [
-    Path("imgs/ai4health/Navinda Kottege.png"),
-    Path("imgs/portraits/TobyBaxter3.jpg"),
-    Path("imgs/portraits/jing-jiang.png"),
-    Path("imgs/Ling_Chen.jpg"),
-    Path("imgs/Mengjie.png"),
-    Path("imgs/portraits/2022_room_mattei.jpg"),  # Nicholas Mattei
-    Path("imgs/Geoff.png"),
-    Path("imgs/mhlarge.jpg"),  # Marcus Hutter
-]
+
+# Source images in display order (left-to-right, top-to-bottom), loaded from data/keynotes.json.
+KEYNOTES = load_roster("keynotes")
+KEYNOTE_IMAGES = [speaker["image"] for speaker in KEYNOTES]
 
 # Layout settings.
 COLUMN_COUNT = 4
@@ -25,35 +24,41 @@ PADDING_Y = 120  # vertical space around and between cells (wider)
 # Transparent background to remove white borders.
 BACKGROUND_COLOR = (0, 0, 0, 0)
 
+CELL_CACHE = CellCache("keynote")
+
 
 def _prepare_cell(image_path: Path) -> Image.Image:
     """Resize/crop the image to a uniform cell size while keeping aspect ratio."""
-    with Image.open(image_path) as img:
-        img = img.convert("RGBA")
-        fitted = ImageOps.fit(img, CELL_SIZE, method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
+    return fit_cell(image_path, CELL_SIZE, BACKGROUND_COLOR)
 
-    cell = Image.new("RGBA", CELL_SIZE, BACKGROUND_COLOR)
-    cell.paste(fitted, (0, 0), mask=fitted)
-    return cell.convert("RGBA")
+
+def prepare_cell(image_path: Path) -> Image.Image:
+    """Cached `_prepare_cell`, keyed by the image contents and the cell layout."""
+    key = fingerprint("keynote", image_path, [CELL_SIZE, BACKGROUND_COLOR])
+    return CELL_CACHE.get_or_render(key, lambda: _prepare_cell(image_path))
 
 
 def build_collage(output_path: Path) -> None:
-    rows = (len(KEYNOTE_IMAGES) + COLUMN_COUNT - 1) // COLUMN_COUNT
-    collage_width = COLUMN_COUNT * CELL_SIZE[0] + (COLUMN_COUNT + 1) * PADDING_X
-    collage_height = rows * CELL_SIZE[1] + (rows + 1) * PADDING_Y
+    rows = row_count(len(KEYNOTE_IMAGES), COLUMN_COUNT)
+    size = grid_size(rows, COLUMN_COUNT, CELL_SIZE, PADDING_X, PADDING_Y)
+    collage = Image.new("RGBA", size, BACKGROUND_COLOR)
+
+    # Loader threads decode and fit the next cells while this loop pastes the current one.
+    for idx, cell in enumerate(prefetch(prepare_cell, KEYNOTE_IMAGES)):
+        x, y = cell_origin(idx, COLUMN_COUNT, CELL_SIZE, PADDING_X, PADDING_Y)
+        with span("paste"):
+            collage.paste(cell, (x, y), mask=cell)
 
-    collage = Image.new("RGBA", (collage_width, collage_height), BACKGROUND_COLOR)
+    with span("encode", file=output_path.name):
+        collage.save(output_path)
 
-    for idx, image_path in enumerate(KEYNOTE_IMAGES):
-        cell = _prepare_cell(image_path)
-        row, col = divmod(idx, COLUMN_COUNT)
-        x = PADDING_X + col * (CELL_SIZE[0] + PADDING_X)
-        y = PADDING_Y + row * (CELL_SIZE[1] + PADDING_Y)
-        collage.paste(cell, (x, y), mask=cell)
 
-    collage.save(output_path)
+def main() -> None:
+    output_path = ROOT / "imgs/keynotes_collage.png"
+    build_collage(output_path)
+    print(f"Saved collage to {output_path}")
+    print(f"Cells: {CELL_CACHE.summary()}")
 
 
 if __name__ == "__main__":
-    build_collage(Path("imgs/keynotes_collage.png"))
-    print("Saved collage to imgs/keynotes_collage.png")
+    main()
@@ -1,32 +1,29 @@
-"""Generate sponsor collages. Includes a combined 3-row image (Gold, Silver, Bronze)."""
+"""Generate sponsor collages. Includes a combined 3-row image (Gold, Silver, Bronze) and a linkable sprite atlas."""
 
-from io import BytesIO
-from math import ceil
+import argparse
+import re
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
-from PIL import Image, ImageDraw, ImageFont, ImageOps
-import cairosvg
+from PIL import Image, ImageFont, ImageOps
 
-ROOT = Path(__file__).parent
+from imaging import ROOT
+from imaging.cells import contain_cell, load_rgba
+from imaging.data import CellCache, fingerprint, load_roster
+from imaging.fonts import font_try_load
+from imaging.grid import cell_origin, grid_size, row_count
+from imaging.pipeline import prefetch
+from imaging.text import draw_centered
+from imaging.trace import span
 
 
-def font_try_load(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
-    """Load a readable font, falling back to Pillow's default."""
-    candidates = [
-        "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf",
-        "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf",
-    ]
-    for path in candidates:
-        try:
-            return ImageFont.truetype(path, size)
-        except OSError:
-            continue
-    return ImageFont.load_default()
+def title_font() -> ImageFont.FreeTypeFont:
+    return font_try_load(40, bold=True)
+
 
+def row_label_font() -> ImageFont.FreeTypeFont:
+    return font_try_load(32, bold=True)
 
-TITLE_FONT = font_try_load(40, bold=True)
-ROW_LABEL_FONT = font_try_load(32, bold=True)
 
 # Layout settings.
 CELL_SIZE = (420, 260)  # width, height for each logo cell (larger for better visibility)
@@ -36,6 +33,15 @@ ROW_GAP = 0  # no extra gap between rows
 BACKGROUND = (0, 0, 0, 0)  # transparent
 TITLE_COLOR = (81, 36, 122, 255)  # main purple
 
+# Sprite atlas settings. Logos are packed at 2x the CSS box used by sponsor.html (220x120) for sharp HiDPI output.
+ATLAS_SCALE = 2
+ATLAS_LOGO_BOX = (220 * ATLAS_SCALE, 120 * ATLAS_SCALE)
+ATLAS_MAX_WIDTH = 1024  # shelf width of the packed atlas, in atlas pixels
+ATLAS_GAP = 4  # transparent gutter so neighbouring logos never bleed in when scaled
+ATLAS_IMAGE = ROOT / "imgs/sponsors_atlas.png"
+ATLAS_CSS = ROOT / "css/sponsors_atlas.css"
+ATLAS_SNIPPET = ROOT / "imgs/sponsors_atlas_snippet.html"
+
 
 class TierConfig:
     def __init__(self, name: str, columns: int, logos: List[Path], output: Path):
@@ -45,112 +51,83 @@ class TierConfig:
         self.output = output
 
 
+# Tiers in display order, loaded from data/sponsors.json.
+SPONSOR_DATA = load_roster("sponsors")
+
 TIERS = [
     TierConfig(
-        "Gold Sponsors",
-        columns=4,  # will wrap second row with remaining 3 logos
-        logos=[
-            ROOT / "imgs/logo-anu.png",
-            ROOT / "imgs/logo_google.png",
-            ROOT / "imgs/monash-logo-mono.svg",
-            ROOT / "imgs/pioneer.png",
-            ROOT / "imgs/yepai.png",
-            ROOT / "imgs/b8bc45d36fcd82e6b8335dc251501b6b.png",
-            ROOT / "imgs/acs-logo.jpeg",
-        ],
-        output=ROOT / "imgs/sponsors_gold_collage.png",
-    ),
-    TierConfig(
-        "Silver Sponsors",
-        columns=3,
-        logos=[
-            ROOT / "imgs/dairnet-logo.png",
-            ROOT / "imgs/Fomelogo.png",
-        ],
-        output=ROOT / "imgs/sponsors_silver_collage.png",
-    ),
-    TierConfig(
-        "Bronze Sponsors",
-        columns=3,
-        logos=[
-            ROOT / "imgs/core.png",
-            ROOT / "imgs/unsw_ai.png",
-            ROOT / "imgs/springer-logo.png",
-        ],
-        output=ROOT / "imgs/sponsors_bronze_collage.png",
-    ),
+        tier["name"],
+        columns=tier["columns"],
+        logos=[logo["image"] for logo in tier["logos"]],
+        output=ROOT / tier["output"],
+    )
+    for tier in SPONSOR_DATA
 ]
 
+# Display name and link for each logo, matching the anchors on sponsor.html.
+SPONSOR_LINKS: Dict[str, Tuple[str, str]] = {
+    logo["image"].name: (logo["name"], logo["url"]) for tier in SPONSOR_DATA for logo in tier["logos"]
+}
 
-def load_image(path: Path) -> Image.Image:
-    if path.suffix.lower() == ".svg":
-        png_bytes = cairosvg.svg2png(url=str(path))
-        img = Image.open(BytesIO(png_bytes))
-    else:
-        img = Image.open(path)
-    return img.convert("RGBA")
+CELL_CACHE = CellCache("sponsor")
 
 
 def prepare_logo(path: Path) -> Image.Image:
-    img = load_image(path)
-    fitted = ImageOps.contain(img, (CELL_SIZE[0] - 20, CELL_SIZE[1] - 20), method=Image.Resampling.LANCZOS)
-    cell = Image.new("RGBA", CELL_SIZE, BACKGROUND)
-    offset = ((CELL_SIZE[0] - fitted.width) // 2, (CELL_SIZE[1] - fitted.height) // 2)
-    cell.paste(fitted, offset, mask=fitted)
-    return cell
+    key = fingerprint("sponsor", path, [CELL_SIZE, BACKGROUND])
+    return CELL_CACHE.get_or_render(key, lambda: _render_logo(path))
+
+
+def _render_logo(path: Path) -> Image.Image:
+    return contain_cell(path, CELL_SIZE, 10, BACKGROUND)
 
 
 def draw_title(canvas: Image.Image, text: str) -> None:
-    draw = ImageDraw.Draw(canvas)
     width, _ = canvas.size
-    text_width = TITLE_FONT.getlength(text)
-    draw.text(((width - text_width) / 2, PADDING), text, font=TITLE_FONT, fill=TITLE_COLOR)
+    draw_centered(canvas, text, title_font(), (0, width), PADDING, TITLE_COLOR)
 
 
 def build_tier_collage(tier: TierConfig) -> Path:
-    rows = ceil(len(tier.logos) / tier.columns)
-    width = tier.columns * CELL_SIZE[0] + (tier.columns + 1) * PADDING
-    height = HEADER_HEIGHT + rows * CELL_SIZE[1] + (rows + 1) * PADDING
-    canvas = Image.new("RGBA", (width, height), BACKGROUND)
+    rows = row_count(len(tier.logos), tier.columns)
+    width, height = grid_size(rows, tier.columns, CELL_SIZE, PADDING, PADDING)
+    canvas = Image.new("RGBA", (width, HEADER_HEIGHT + height), BACKGROUND)
 
     draw_title(canvas, tier.name)
 
-    for idx, logo_path in enumerate(tier.logos):
-        row, col = divmod(idx, tier.columns)
-        x = PADDING + col * (CELL_SIZE[0] + PADDING)
-        y = HEADER_HEIGHT + PADDING + row * (CELL_SIZE[1] + PADDING)
-        cell = prepare_logo(logo_path)
-        canvas.paste(cell, (x, y), mask=cell)
+    for idx, cell in enumerate(prefetch(prepare_logo, tier.logos)):
+        x, y = cell_origin(idx, tier.columns, CELL_SIZE, PADDING, PADDING)
+        y += HEADER_HEIGHT
+        with span("paste"):
+            canvas.paste(cell, (x, y), mask=cell)
 
-    canvas.save(tier.output)
+    with span("encode", file=tier.output.name):
+        canvas.save(tier.output)
     return tier.output
 
 
 def draw_row_label(canvas: Image.Image, text: str, y: int, row_width: int, total_width: int) -> None:
-    draw = ImageDraw.Draw(canvas)
-    text_width = ROW_LABEL_FONT.getlength(text)
-    x = (total_width - text_width) / 2
-    draw.text((x, y), text, font=ROW_LABEL_FONT, fill=TITLE_COLOR)
+    draw_centered(canvas, text, row_label_font(), (0, total_width), y, TITLE_COLOR)
 
 
-def build_combined_collage(tiers: List[TierConfig]) -> Path:
+def build_combined_collage(tiers: List[TierConfig], output: Path = ROOT / "imgs/sponsors_all_collage.png") -> Path:
     max_cols = max(t.columns for t in tiers)
     total_width = max_cols * CELL_SIZE[0] + (max_cols + 1) * PADDING
 
     def tier_block_height(tier: TierConfig) -> int:
-        rows = ceil(len(tier.logos) / tier.columns)
-        return ROW_LABEL_FONT.size + 10 + (rows * CELL_SIZE[1]) + (rows + 1) * PADDING
+        rows = row_count(len(tier.logos), tier.columns)
+        return row_label_font().size + 10 + (rows * CELL_SIZE[1]) + (rows + 1) * PADDING
 
     rows_height = sum(tier_block_height(t) for t in tiers) + ROW_GAP * (len(tiers) - 1)
     height = HEADER_HEIGHT + rows_height
     canvas = Image.new("RGBA", (total_width, height), BACKGROUND)
 
+    # One read-ahead stream over every logo in paste order, so loading runs ahead across tier boundaries too.
+    cells = prefetch(prepare_logo, [logo for tier in tiers for logo in tier.logos])
     y_cursor = HEADER_HEIGHT
     for tier in tiers:
-        rows = ceil(len(tier.logos) / tier.columns)
+        rows = row_count(len(tier.logos), tier.columns)
         # Center the label across the full canvas for consistency.
         draw_row_label(canvas, tier.name, y_cursor + PADDING, total_width, total_width)
-        y_cursor += PADDING + ROW_LABEL_FONT.size + 10
+        y_cursor += PADDING + row_label_font().size + 10
 
         # Logos in multiple rows; center each row individually.
         for row in range(rows):
@@ -159,25 +136,131 @@ def build_combined_collage(tiers: List[TierConfig]) -> Path:
             logos_in_row = tier.logos[start:end]
             row_width = len(logos_in_row) * CELL_SIZE[0] + (len(logos_in_row) + 1) * PADDING
             x_offset = int((total_width - row_width) / 2)
-            for col, logo_path in enumerate(logos_in_row):
+            for col in range(len(logos_in_row)):
                 x = x_offset + PADDING + col * (CELL_SIZE[0] + PADDING)
                 y = y_cursor + row * (CELL_SIZE[1] + PADDING)
-                cell = prepare_logo(logo_path)
-                canvas.paste(cell, (x, y), mask=cell)
+                cell = next(cells)
+                with span("paste"):
+                    canvas.paste(cell, (x, y), mask=cell)
 
         y_cursor += rows * CELL_SIZE[1] + (rows + 1) * PADDING
         y_cursor += ROW_GAP
 
-    output = ROOT / "imgs/sponsors_all_collage.png"
-    canvas.save(output)
+    with span("encode", file=output.name):
+        canvas.save(output)
     return output
 
 
+def sprite_class(path: Path) -> str:
+    name = SPONSOR_LINKS.get(path.name, (path.stem, ""))[0]
+    return "sponsor-sprite-" + re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def pack_shelves(sizes: List[Tuple[int, int]], max_width: int, gap: int) -> Tuple[List[Tuple[int, int]], Tuple[int, int]]:
+    """Shelf-pack rectangles (tallest first) and return their positions plus the atlas size."""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions: List[Tuple[int, int]] = [(0, 0)] * len(sizes)
+    x = y = shelf_height = atlas_width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > max_width:
+            y += shelf_height + gap
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w + gap
+        shelf_height = max(shelf_height, h)
+        atlas_width = max(atlas_width, x - gap)
+    return positions, (atlas_width, y + shelf_height)
+
+
+def prepare_atlas_logo(path: Path) -> Image.Image:
+    img = load_rgba(path)
+    with span("resample"):
+        img = ImageOps.contain(img, ATLAS_LOGO_BOX, method=Image.Resampling.LANCZOS)
+    # Pad to even dimensions so every CSS size and offset is a whole pixel at ATLAS_SCALE.
+    even = ((img.width + 1) // 2 * 2, (img.height + 1) // 2 * 2)
+    if even == img.size:
+        return img
+    padded = Image.new("RGBA", even, BACKGROUND)
+    padded.paste(img, ((even[0] - img.width) // 2, (even[1] - img.height) // 2))
+    return padded
+
+
+def build_sprite_atlas(tiers: List[TierConfig]) -> List[Path]:
+    """Pack every sponsor logo into one image and emit matching CSS and an HTML snippet with per-sponsor links."""
+    logos: List[Path] = []
+    for tier in tiers:
+        logos.extend(logo for logo in tier.logos if logo not in logos)
+
+    images = [prepare_atlas_logo(logo) for logo in logos]
+    positions, atlas_size = pack_shelves([img.size for img in images], ATLAS_MAX_WIDTH, ATLAS_GAP)
+    atlas = Image.new("RGBA", atlas_size, BACKGROUND)
+    with span("paste"):
+        for img, pos in zip(images, positions):
+            atlas.paste(img, pos)
+    with span("encode", file=ATLAS_IMAGE.name):
+        atlas.save(ATLAS_IMAGE, optimize=True)
+
+    css_url = Path("..") / ATLAS_IMAGE.relative_to(ROOT)
+    css = [
+        "/* Generated by create_sponsor_collages.py --atlas; do not edit by hand. */",
+        ".sponsor-sprite {",
+        "  display: inline-block;",
+        f"  background-image: url('{css_url.as_posix()}');",
+        f"  background-size: {atlas_size[0] // ATLAS_SCALE}px {atlas_size[1] // ATLAS_SCALE}px;",
+        "  background-repeat: no-repeat;",
+        "}",
+    ]
+    for logo, img, (x, y) in zip(logos, images, positions):
+        css += [
+            f".{sprite_class(logo)} {{",
+            f"  width: {img.width // ATLAS_SCALE}px;",
+            f"  height: {img.height // ATLAS_SCALE}px;",
+            f"  background-position: -{x // ATLAS_SCALE}px -{y // ATLAS_SCALE}px;",
+            "}",
+        ]
+    ATLAS_CSS.write_text("\n".join(css) + "\n")
+
+    html = [f"<link rel=\"stylesheet\" type='text/css' href='./{ATLAS_CSS.relative_to(ROOT).as_posix()}' />"]
+    for tier in tiers:
+        html.append(f'<h3 class="pt-9 mb-5 font-titleFont text-2xl text-mainPurple font-extrabold text-center">{tier.name}</h3>')
+        html.append("<div class='flex flex-row justify-center flex-wrap mt-6'>")
+        for logo in tier.logos:
+            name, url = SPONSOR_LINKS.get(logo.name, (logo.stem, "#"))
+            html += [
+                '  <div class="sponsor-logo-container">',
+                f'    <a href="{url}" target="_blank" rel="noreferrer">',
+                f'      <span class="sponsor-sprite {sprite_class(logo)}" role="img" aria-label="{name} Logo"></span>',
+                "    </a>",
+                "  </div>",
+            ]
+        html.append("</div>")
+    ATLAS_SNIPPET.write_text("\n".join(html) + "\n")
+
+    return [ATLAS_IMAGE, ATLAS_CSS, ATLAS_SNIPPET]
+
+
 def main() -> None:
-    outputs = [build_tier_collage(tier) for tier in TIERS]
-    outputs.append(build_combined_collage(TIERS))
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--atlas", action="store_true", help="Build the sponsor sprite atlas, CSS and HTML snippet instead of the collages")
+    args = parser.parse_args()
+
+    try:
+        if args.atlas:
+            with span("atlas", cat="build"):
+                outputs = build_sprite_atlas(TIERS)
+        else:
+            outputs = []
+            for tier in TIERS:
+                with span(tier.name, cat="build"):
+                    outputs.append(build_tier_collage(tier))
+            with span("combined", cat="build"):
+                outputs.append(build_combined_collage(TIERS))
+    except ImportError as exc:  # an SVG logo without cairosvg installed
+        raise SystemExit(f"❌ Error: {exc}")
     for path in outputs:
         print(f"Saved {path}")
+    print(f"Cells: {CELL_CACHE.summary()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,337 @@
+"""Find near-duplicate images under imgs/ with perceptual hashes and list the pages that use each copy."""
+
+import argparse
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+import numpy as np
+from PIL import Image
+
+from imaging import ROOT
+from imaging.data import file_digest
+
+IMAGE_DIR = ROOT / "imgs"
+CACHE_PATH = ROOT / ".image_hash_cache.json"
+
+RASTER_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".bmp", ".tif", ".tiff"}
+HASH_SIZE = 8  # 8x8 => 64-bit hashes
+PHASH_SAMPLE = 32  # pHash runs a DCT on a 32x32 thumbnail
+CACHE_VERSION = 1
+
+# Two images are reported as duplicates when both hashes are within these Hamming distances.
+PHASH_THRESHOLD = 10
+DHASH_THRESHOLD = 12
+
+IMAGE_REF_RE = re.compile(r"""(?:src|href|content)\s*=\s*["']([^"']+)["']|url\(\s*["']?([^"')]+)["']?\s*\)""", re.I)
+
+
+def _grayscale(path: Path) -> Image.Image:
+    with Image.open(path) as img:
+        img.seek(0)
+        rgba = img.convert("RGBA")
+    # Flatten transparency onto white so logos with alpha hash like their JPEG copies.
+    flat = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+    flat.alpha_composite(rgba)
+    return flat.convert("L")
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(PHASH_SAMPLE)
+
+
+def dhash(gray: Image.Image) -> int:
+    """Difference hash: sign of horizontal gradients on a 9x8 thumbnail."""
+    small = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.int16)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash(gray: Image.Image) -> int:
+    """DCT hash: low-frequency coefficients of a 32x32 thumbnail against their median."""
+    small = np.asarray(gray.resize((PHASH_SAMPLE, PHASH_SAMPLE), Image.Resampling.LANCZOS), dtype=np.float64)
+    coeffs = (_DCT @ small @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    median = np.median(coeffs.flatten()[1:])  # skip the DC term, it only encodes brightness
+    return _bits_to_int(coeffs > median)
+
+
+def display_path(path: Path) -> str:
+    """Repository-relative path for files under ROOT, the absolute path for a --dir outside it."""
+    try:
+        return str(path.relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+
+def hash_image(path: Path) -> Dict[str, str]:
+    """The image's hashes and size, or {"error": ...} when it cannot be decoded."""
+    try:
+        gray = _grayscale(path)
+    except Exception as exc:  # unsupported codec (e.g. AVIF without plugin) or corrupt file
+        return {"error": str(exc)}
+    return {"dhash": f"{dhash(gray):016x}", "phash": f"{phash(gray):016x}", "size": f"{gray.width}x{gray.height}"}
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance; range queries prune by the triangle inequality."""
+
+    def __init__(self) -> None:
+        self.root: Optional[Tuple[int, str, Dict[int, tuple]]] = None
+
+    def add(self, value: int, key: str) -> None:
+        node = (value, key, {})
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, str]]:
+        if self.root is None:
+            return []
+        matches: List[Tuple[int, str]] = []
+        stack = [self.root]
+        while stack:
+            node_value, node_key, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= radius:
+                matches.append((distance, node_key))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return matches
+
+
+def load_cache(path: Path = CACHE_PATH) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Hashes by content digest, and files that failed to decode by path with the size and mtime that failed."""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        data = {}
+    if data.get("version") != CACHE_VERSION:
+        data = {}
+    return {"hashes": data.get("hashes", {}), "failures": data.get("failures", {})}
+
+
+def save_cache(cache: Dict[str, Dict[str, Dict[str, Any]]], path: Path = CACHE_PATH) -> None:
+    path.write_text(json.dumps({"version": CACHE_VERSION, **cache}, indent=1, sort_keys=True))
+
+
+def iter_images(image_dir: Path = IMAGE_DIR) -> Iterable[Path]:
+    for path in sorted(image_dir.rglob("*")):
+        if path.is_file() and path.suffix.lower() in RASTER_SUFFIXES:
+            yield path
+
+
+def _stat_key(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def compute_hashes(paths: List[Path], workers: Optional[int] = None) -> Dict[Path, Dict[str, str]]:
+    """Hash every image, decoding only files whose content is not already in the cache.
+
+    A file that failed to decode is skipped without reading it again until its size or mtime changes.
+    """
+    cache = load_cache()
+    hashes, failures = cache["hashes"], cache["failures"]
+    failed = []
+    for path in paths:
+        failure = failures.get(str(path))
+        if failure and {k: failure[k] for k in ("size", "mtime_ns")} == _stat_key(path):
+            print(f"Skipping {display_path(path)}: {failure['error']} (unchanged since it failed)")
+            failed.append(path)
+    digests = {path: file_digest(path) for path in paths if path not in failed}
+    missing = sorted({digest: path for path, digest in digests.items() if digest not in hashes}.items())
+
+    if missing:
+        print(f"Hashing {len(missing)} new or changed images ({len(set(digests.values())) - len(missing)} cached)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (digest, path), result in zip(missing, pool.map(hash_image, [p for _, p in missing], chunksize=4)):
+                if "error" in result:
+                    print(f"Skipping {display_path(path)}: {result['error']}")
+                    failures[str(path)] = {**_stat_key(path), "error": result["error"]}
+                else:
+                    hashes[digest] = result
+        live = set(digests.values())
+        names = {str(path) for path in paths}
+        save_cache({
+            "hashes": {digest: entry for digest, entry in hashes.items() if digest in live},
+            "failures": {name: entry for name, entry in failures.items() if name in names},
+        })
+
+    return {path: hashes[digest] for path, digest in digests.items() if digest in hashes}
+
+
+def cluster(hashes: Dict[Path, Dict[str, str]], phash_threshold: int, dhash_threshold: int) -> List[List[Path]]:
+    """Group images whose pHash and dHash are both within threshold, using a BK-tree over pHash."""
+    keys = {str(path): path for path in hashes}
+    phashes = {key: int(hashes[path]["phash"], 16) for key, path in keys.items()}
+    dhashes = {key: int(hashes[path]["dhash"], 16) for key, path in keys.items()}
+
+    parent = {key: key for key in keys}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    tree = BKTree()
+    for key in sorted(keys):
+        for _, other in tree.search(phashes[key], phash_threshold):
+            if hamming(dhashes[key], dhashes[other]) <= dhash_threshold:
+                parent[find(key)] = find(other)
+        tree.add(phashes[key], key)
+
+    groups: Dict[str, List[Path]] = {}
+    for key in keys:
+        groups.setdefault(find(key), []).append(keys[key])
+    return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=lambda g: str(g[0]))
+
+
+def split_resized(groups: List[List[Path]], hashes: Dict[Path, Dict[str, str]]) -> Tuple[List[List[Path]], List[List[Path]]]:
+    """Split clusters into duplicates (same dimensions) and resized variants (one picture at several sizes).
+
+    Resized variants such as the favicon set or a logo exported small and large are usually all in use, so
+    they are reported apart and not counted as reclaimable; same-size copies within them still are.
+    """
+    duplicates: List[List[Path]] = []
+    resized: List[List[Path]] = []
+    for group in groups:
+        by_size: Dict[str, List[Path]] = {}
+        for path in group:
+            by_size.setdefault(hashes[path]["size"], []).append(path)
+        duplicates.extend(same for same in by_size.values() if len(same) > 1)
+        if len(by_size) > 1:
+            resized.append(group)
+    return duplicates, resized
+
+
+def name_key(path: Path) -> str:
+    """Normalise a file name so `jing-jiang.png`, `jing_jiang.jpeg` and `chang_xu.png.jpg` collide."""
+    stem = path.name.lower()
+    while Path(stem).suffix in RASTER_SUFFIXES:
+        stem = Path(stem).stem
+    return re.sub(r"[\s\-]+", "_", stem)
+
+
+def name_variants(paths: Iterable[Path], groups: List[List[Path]]) -> List[List[Path]]:
+    """Same-name copies that the hashes did not match (re-crops, re-exports, different photos)."""
+    clustered = {path for group in groups for path in group}
+    by_name: Dict[Tuple[Path, str], List[Path]] = {}
+    for path in paths:
+        by_name.setdefault((path.parent, name_key(path)), []).append(path)
+    return [
+        sorted(group)
+        for _, group in sorted(by_name.items())
+        if len(group) > 1 and not set(group) <= clustered
+    ]
+
+
+def find_references(pages: Iterable[Path]) -> Dict[Path, List[str]]:
+    """Map each referenced file under ROOT to the HTML pages that mention it."""
+    references: Dict[Path, List[str]] = {}
+    for page in pages:
+        text = page.read_text(encoding="utf-8", errors="replace")
+        for match in IMAGE_REF_RE.finditer(text):
+            ref = unquote((match.group(1) or match.group(2)).split("?")[0].split("#")[0])
+            if "://" in ref or ref.startswith("data:"):
+                continue
+            target = (page.parent / ref.lstrip("/")).resolve()
+            pages_for_target = references.setdefault(target, [])
+            if page.name not in pages_for_target:
+                pages_for_target.append(page.name)
+    return references
+
+
+def _print_group(title: str, group: List[Path], hashes: Dict[Path, Dict[str, str]], references: Dict[Path, List[str]]) -> int:
+    print(f"\n{title}:")
+    sizes = [path.stat().st_size for path in group]
+    for path, size in zip(group, sizes):
+        pages = references.get(path.resolve(), [])
+        used_by = ", ".join(pages) if pages else "unreferenced"
+        dims = hashes[path]["size"] if path in hashes else "?"
+        print(f"  {display_path(path):<55} {dims:>10} {size / 1024:>8.1f} KB  <- {used_by}")
+    return sum(sizes) - max(sizes)
+
+
+def report(
+    groups: List[List[Path]],
+    resized: List[List[Path]],
+    variants: List[List[Path]],
+    hashes: Dict[Path, Dict[str, str]],
+    references: Dict[Path, List[str]],
+) -> None:
+    if not groups:
+        print("No near-duplicate images found.")
+    wasted = 0
+    for index, group in enumerate(groups, start=1):
+        wasted += _print_group(f"Group {index}", group, hashes, references)
+    if groups:
+        print(f"\n{len(groups)} groups, up to {wasted / 1024:.1f} KB reclaimable by keeping one copy per group.")
+
+    for index, group in enumerate(resized, start=1):
+        _print_group(f"Resized variant {index} (same picture at several sizes, not counted)", group, hashes, references)
+
+    for index, group in enumerate(variants, start=1):
+        _print_group(f"Same-name variant {index} (hashes differ, check by eye)", group, hashes, references)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", type=Path, default=IMAGE_DIR, help="Image directory to scan (default: imgs/)")
+    parser.add_argument("--phash-threshold", type=int, default=PHASH_THRESHOLD)
+    parser.add_argument("--dhash-threshold", type=int, default=DHASH_THRESHOLD)
+    parser.add_argument("--workers", type=int, default=None, help="Decoder processes (default: CPU count)")
+    parser.add_argument("--json", dest="json_out", type=Path, default=None, help="Also write the groups as JSON")
+    args = parser.parse_args()
+
+    paths = list(iter_images(args.dir.resolve()))
+    hashes = compute_hashes(paths, workers=args.workers)
+    clusters = cluster(hashes, args.phash_threshold, args.dhash_threshold)
+    groups, resized = split_resized(clusters, hashes)
+    references = find_references(sorted(ROOT.glob("*.html")))
+    variants = name_variants(paths, clusters)
+    report(groups, resized, variants, hashes, references)
+
+    if args.json_out:
+        payload = {
+            kind: [
+                [{"path": display_path(p), "pages": references.get(p.resolve(), []), **hashes[p]} for p in group]
+                for group in kind_groups
+            ]
+            for kind, kind_groups in (("duplicates", groups), ("resized", resized))
+        }
+        args.json_out.write_text(json.dumps(payload, indent=2))
+        print(f"Saved {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Generate every T-shirt logo colorway from a master SVG and the palette table in data/tshirt_palettes.json.
+
+Each master SVG (in imgs/tshirt/master/, which the generator never writes) names the colour used for every
+role (gradient stops, frame, ink). A colorway picks a master and gives a colour per role; the generator
+rewrites all fill/stroke/stop-color values in one regex pass and writes `ajcai2025-logo-tshirt-<name>.svg`.
+A colorway may also give a `"raster"` ramp (dark to light colours): embedded PNGs in the master are then
+recoloured through a 256-entry lookup table on their luminance, keeping alpha. All variants are rasterised
+to PNG in parallel.
+"""
+
+import argparse
+import base64
+import io
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageColor
+
+from imaging import ROOT
+from imaging.data import DATA_DIR
+from imaging.svg import render_svg, require_cairosvg
+from imaging.trace import pool_map, span
+
+PALETTES_PATH = DATA_DIR / "tshirt_palettes.json"
+OUTPUT_DIR = ROOT / "imgs" / "tshirt"
+FILE_PATTERN = "ajcai2025-logo-tshirt-{name}"
+
+COLOR_ATTR_RE = r"""((?:fill|stroke|stop-color)\s*(?:=\s*["']|:\s*))({colors})(?=["';\s])"""
+EMBEDDED_PNG_RE = re.compile(r"data:image/png;base64,([A-Za-z0-9+/=\s]+)")
+
+
+def load_palettes(path: Path = PALETTES_PATH) -> Dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def recolor_vectors(svg: str, roles: Dict[str, str], colors: Dict[str, str]) -> str:
+    """Swap every master role colour for the colorway's colour in a single pass over the SVG."""
+    mapping = {roles[role].lower(): colors[role] for role in roles}
+    pattern = re.compile(
+        COLOR_ATTR_RE.format(colors="|".join(re.escape(color) for color in sorted(mapping, key=len, reverse=True))),
+        re.IGNORECASE,
+    )
+    # Substituting in one pass means a colour that maps onto another master colour is never remapped twice.
+    return pattern.sub(lambda match: match.group(1) + mapping[match.group(2).lower()], svg)
+
+
+def ramp_lut(ramp: Sequence[str]) -> np.ndarray:
+    """256x3 lookup table spreading the ramp colours evenly from black (index 0) to white (index 255)."""
+    stops = np.array([ImageColor.getrgb(color)[:3] for color in ramp], dtype=np.float64)
+    positions = np.linspace(0, 255, len(stops))
+    levels = np.arange(256)
+    return np.stack([np.interp(levels, positions, stops[:, channel]) for channel in range(3)], axis=1).round().astype(np.uint8)
+
+
+def recolor_raster(image: Image.Image, lut: np.ndarray) -> Image.Image:
+    """Map each pixel's luminance through `lut`, keeping the original alpha."""
+    rgba = image.convert("RGBA")
+    pixels = np.asarray(rgba)
+    luminance = np.asarray(rgba.convert("L"))
+    out = np.empty_like(pixels)
+    out[..., :3] = lut[luminance]
+    out[..., 3] = pixels[..., 3]
+    return Image.fromarray(out, "RGBA")
+
+
+def recolor_embedded(svg: str, ramp: Sequence[str]) -> str:
+    lut = ramp_lut(ramp)
+
+    def replace(match: re.Match) -> str:
+        with span("decode"):
+            image = Image.open(io.BytesIO(base64.b64decode(match.group(1))))
+            image.load()
+        with span("recolor", size=f"{image.width}x{image.height}"):
+            recolored = recolor_raster(image, lut)
+        buffer = io.BytesIO()
+        with span("encode"):
+            recolored.save(buffer, format="PNG")
+        return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    return EMBEDDED_PNG_RE.sub(replace, svg)
+
+
+def build_svg(palettes: Dict, name: str, masters: Dict[str, str]) -> str:
+    colorway = palettes["colorways"][name]
+    master = palettes["masters"][colorway["master"]]
+    svg = recolor_vectors(masters[colorway["master"]], master["roles"], colorway["colors"])
+    if colorway.get("raster"):
+        svg = recolor_embedded(svg, colorway["raster"])
+    return svg
+
+
+def _rasterize(job: Tuple[Path, Path, int, int]) -> Path:
+    svg_path, png_path, width, height = job
+    render_svg(svg_path, png_path, output_width=width, output_height=height, dpi=300)
+    return png_path
+
+
+def generate(
+    names: Optional[List[str]] = None,
+    output_dir: Path = OUTPUT_DIR,
+    palettes_path: Path = PALETTES_PATH,
+    workers: Optional[int] = None,
+    png: bool = True,
+) -> List[Path]:
+    """Write the SVG for every requested colorway, then rasterise them all in a process pool."""
+    palettes = load_palettes(palettes_path)
+    names = names or list(palettes["colorways"])
+    unknown = sorted(set(names) - set(palettes["colorways"]))
+    if unknown:
+        raise SystemExit(f"Unknown colorway(s): {', '.join(unknown)}; choose from {', '.join(palettes['colorways'])}")
+
+    # Overwriting a master would make the next run recolour from this run's output instead.
+    master_paths = {(ROOT / master["path"]).resolve() for master in palettes["masters"].values()}
+    svg_paths = [output_dir / f"{FILE_PATTERN.format(name=name)}.svg" for name in names]
+    clashes = [path for path in svg_paths if path.resolve() in master_paths]
+    if clashes:
+        raise SystemExit(f"Refusing to overwrite master SVG(s): {', '.join(str(path) for path in clashes)}")
+
+    # Read each master once even when several colorways share it.
+    masters = {key: (ROOT / master["path"]).read_text(encoding="utf-8") for key, master in palettes["masters"].items()}
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for name, svg_path in zip(names, svg_paths):
+        svg_path.write_text(build_svg(palettes, name, masters), encoding="utf-8")
+        print(f"Saved {svg_path}")
+
+    if not png:
+        return svg_paths
+
+    require_cairosvg()
+    width, height = palettes["size"]
+    jobs = [(svg_path, svg_path.with_suffix(".png"), width, height) for svg_path in svg_paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        png_paths = list(pool_map(pool, _rasterize, jobs))
+    for png_path in png_paths:
+        print(f"Saved {png_path}")
+    return svg_paths + png_paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="colorways to build (default: all in the palette table)")
+    parser.add_argument("--palettes", type=Path, default=PALETTES_PATH, help="palette table JSON")
+    parser.add_argument("-o", "--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="rasteriser processes (default: CPU count)")
+    parser.add_argument("--no-png", action="store_true", help="only write the SVGs")
+    args = parser.parse_args()
+    try:
+        generate(args.names, args.output_dir, args.palettes, args.workers, png=not args.no_png)
+    except ImportError as exc:
+        raise SystemExit(f"❌ Error: {exc}")
+
+
+if __name__ == "__main__":
+    main()
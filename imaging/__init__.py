@@ -0,0 +1,9 @@
+"""Shared imaging core for the site's asset scripts.
+
+Submodules are deliberately light to import: Pillow, NumPy and CairoSVG are only pulled in by the code
+paths that use them, and fonts are loaded on first use. Run `python -m imaging --help` for the CLI.
+"""
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
@@ -0,0 +1,54 @@
+"""Single entry point for the asset scripts: `python -m imaging <command> [args...]`.
+
+Each command maps to a script's `main()`; the script is imported only when its command runs, so
+`--help` and light commands never load Pillow, NumPy or CairoSVG. `--trace OUT.json` (or the
+IMAGING_TRACE environment variable) records per-stage timings; see imaging.trace.
+"""
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "committee": ("create_committee_collages", "Build the committee collage pages"),
+    "keynotes": ("create_keynote_collage", "Build the keynote headshot collage"),
+    "sponsors": ("create_sponsor_collages", "Build sponsor collages (--atlas for the sprite atlas)"),
+    "svg2png": ("svg_to_png_converter", "Convert SVG files to PNG"),
+    "ajcai-logos": ("convert_ajcai_logos", "Convert the AJCAI logo SVGs to PNG"),
+    "adjust-logo": ("adjust_logo_layout", "Adjust the T-shirt logo layout and export a high-res PNG"),
+    "logo-colors": ("convert_logo_colors", "Recolour logo.png and embed it in the T-shirt SVG"),
+    "colorways": ("generate_tshirt_colorways", "Generate every T-shirt logo colorway from the palette table"),
+    "portraits": ("ingest_portraits", "Normalise imgs/portraits/ (orientation, size, sRGB, metadata, names)"),
+    "duplicates": ("find_duplicate_images", "Report near-duplicate images under imgs/"),
+    "bench": ("imaging.bench", "Benchmark the build functions and compare against a baseline"),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="python -m imaging",
+        description=__doc__.splitlines()[0],
+        epilog="\n".join(f"  {name:<13} {help_text}" for name, (_, help_text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--trace", type=Path, metavar="OUT.json", help="record stage timings as a Chrome/Perfetto trace")
+    parser.add_argument("command", choices=sorted(COMMANDS), metavar="command", help="one of the commands below")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the command")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        from imaging import trace
+
+        trace.enable(args.trace)
+
+    module_name, _ = COMMANDS[args.command]
+    # Hand the remaining arguments to the script's own argparse, as if it had been run directly.
+    sys.argv = [f"python -m imaging {args.command}", *args.args]
+    importlib.import_module(module_name).main()
+
+
+if __name__ == "__main__":
+    main()
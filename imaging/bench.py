@@ -0,0 +1,410 @@
+"""Benchmarks for the imaging scripts on deterministic synthetic inputs.
+
+    python -m imaging bench run [-o results.json] [--save-baseline] [-k FILTER] [--repeat N]
+    python -m imaging bench compare [BASELINE] [CURRENT] [--threshold 0.15]
+
+Every case runs in a fresh spawned process so peak RSS is attributable to that case alone. Results
+(median/min wall time and peak RSS) are written as JSON; `compare` flags cases whose median wall time
+or peak RSS grew by more than the threshold, or that ran in the baseline but now error, and exits
+non-zero if any did. Only the cases selected in the current run are compared; cases skipped there
+(SVG cases without cairosvg) are reported as skipped.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from imaging import ROOT
+
+BASELINE_PATH = ROOT / ".bench/baseline.json"
+RESULTS_PATH = ROOT / ".bench/latest.json"
+SEED = 2025
+
+PORTRAIT_SIZES = (400, 1600, 4000)
+PORTRAIT_FORMATS = ("JPEG", "PNG", "WEBP")
+LARGE_LOGO_SIZE = (3000, 1200)
+GRADIENT_LOGO_SIZE = (480, 136)
+ROSTER_SIZE = 24
+
+# A case factory receives the fixture directory and a scratch directory and returns the callable to time.
+CaseFactory = Callable[[Path, Path], Callable[[], Any]]
+CASES: Dict[str, CaseFactory] = {}
+
+
+def case(name: str) -> Callable[[CaseFactory], CaseFactory]:
+    def register(factory: CaseFactory) -> CaseFactory:
+        CASES[name] = factory
+        return factory
+
+    return register
+
+
+# --------- Synthetic fixtures ---------
+def _portrait(size: int, seed: int):
+    """Smooth face-like blob on a gradient with film grain, so codecs and resamplers do real work."""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    h = size
+    w = int(size * 0.8)
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    cx, cy = w * rng.uniform(0.4, 0.6), h * rng.uniform(0.35, 0.5)
+    blob = np.exp(-(((xx - cx) / (w * 0.25)) ** 2 + ((yy - cy) / (h * 0.3)) ** 2))
+    base = np.stack([40 + 180 * blob, 30 + 150 * blob, 60 + 120 * (yy / h)], axis=-1)
+    base += rng.normal(0, 6, base.shape)
+    return Image.fromarray(np.clip(base, 0, 255).astype(np.uint8), "RGB")
+
+
+def _logo(size, seed: int):
+    """RGBA logo: coloured shapes on transparency, white text-like bars (what create_gradient_logo recolours)."""
+    import random
+
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    for _ in range(40):
+        x0, y0 = rng.uniform(0, w * 0.9), rng.uniform(0, h * 0.9)
+        x1, y1 = x0 + rng.uniform(w * 0.02, w * 0.2), y0 + rng.uniform(h * 0.05, h * 0.4)
+        colour = rng.choice([(255, 255, 255, 255), (180, 180, 180, 255), (20, 20, 20, 255), (81, 36, 122, 255)])
+        if rng.random() < 0.5:
+            draw.rectangle((x0, y0, x1, y1), fill=colour)
+        else:
+            draw.ellipse((x0, y0, x1, y1), fill=colour)
+    return img
+
+
+SVG_LOGO = """<svg xmlns="http://www.w3.org/2000/svg" width="600" height="160" viewBox="0 0 600 160">
+  <defs><linearGradient id="g" x1="0" x2="1"><stop offset="0" stop-color="#51247A"/><stop offset="1" stop-color="#BF872B"/></linearGradient></defs>
+  <rect x="0" y="0" width="600" height="160" rx="24" fill="url(#g)" opacity="0.15"/>
+  {shapes}
+</svg>
+"""
+
+
+def _svg_logo(seed: int) -> str:
+    import random
+
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(60):
+        x, y, r = rng.uniform(0, 600), rng.uniform(0, 160), rng.uniform(4, 30)
+        shapes.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r:.1f}" fill="url(#g)" stroke="#51247A" stroke-width="1.5"/>')
+        shapes.append(f'<polygon points="{x:.1f},{y:.1f} {x + r:.1f},{y + 2 * r:.1f} {x - r:.1f},{y + 2 * r:.1f}" fill="#51247A"/>')
+    return SVG_LOGO.format(shapes="\n  ".join(shapes))
+
+
+def make_fixtures(directory: Path) -> Path:
+    """Write every synthetic input into `directory`; identical bytes on every run for a given Pillow build."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for size in PORTRAIT_SIZES:
+        portrait = _portrait(size, SEED + size)
+        for fmt in PORTRAIT_FORMATS:
+            portrait.save(directory / f"portrait_{size}.{fmt.lower()}", format=fmt, quality=90)
+    _logo(LARGE_LOGO_SIZE, SEED).save(directory / "logo_large.png")
+    _logo(GRADIENT_LOGO_SIZE, SEED + 1).save(directory / "logo_gradient_src.png")
+    for index in range(4):
+        (directory / f"logo_{index}.svg").write_text(_svg_logo(SEED + index))
+    for index in range(ROSTER_SIZE):
+        size = PORTRAIT_SIZES[index % len(PORTRAIT_SIZES)] // 2
+        fmt = PORTRAIT_FORMATS[index % len(PORTRAIT_FORMATS)]
+        _portrait(size, SEED + 100 + index).save(directory / f"person_{index:02d}.{fmt.lower()}", format=fmt, quality=90)
+    return directory
+
+
+def _has_cairosvg() -> bool:
+    try:
+        import cairosvg  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def _cold_cache(module, kind: str, scratch: Path) -> None:
+    """Point a script's cell cache at an empty directory so each run measures real rendering."""
+    from imaging.data import CellCache
+
+    module.CELL_CACHE = CellCache(kind, scratch / f"cache-{time.perf_counter_ns()}")
+
+
+# --------- Cases: public build functions ---------
+for _size in PORTRAIT_SIZES:
+    for _fmt in PORTRAIT_FORMATS:
+
+        @case(f"prepare_headshot[{_fmt.lower()}-{_size}]")
+        def _headshot(fixtures: Path, scratch: Path, _name=f"portrait_{_size}.{_fmt.lower()}"):
+            import create_committee_collages
+
+            return lambda: create_committee_collages.prepare_headshot(fixtures / _name)
+
+
+@case("prepare_logo[large-rgba]")
+def _logo_large(fixtures: Path, scratch: Path):
+    import create_sponsor_collages
+
+    return lambda: create_sponsor_collages._render_logo(fixtures / "logo_large.png")
+
+
+@case("prepare_logo[svg]")
+def _logo_svg(fixtures: Path, scratch: Path):
+    import create_sponsor_collages
+
+    return lambda: create_sponsor_collages._render_logo(fixtures / "logo_0.svg")
+
+
+@case("create_gradient_logo")
+def _gradient(fixtures: Path, scratch: Path):
+    import convert_logo_colors
+
+    return lambda: convert_logo_colors.create_gradient_logo(str(fixtures / "logo_gradient_src.png"))
+
+
+@case("convert_svg_to_png")
+def _svg(fixtures: Path, scratch: Path):
+    from imaging.svg import convert_svg_to_png
+
+    return lambda: convert_svg_to_png(fixtures / "logo_1.svg", scratch / "logo_1.png", width=600, height=160)
+
+
+# --------- Cases: end-to-end entry points on synthetic rosters ---------
+def _committee_roster(fixtures: Path) -> List[Dict]:
+    return [
+        {
+            "name": f"Person Number {index}",
+            "role": ["General Chair", "Publicity Chair", "Workshop/Tutorial Chair"][index % 3],
+            "affiliation": "The Synthetic University of Benchmarking, Australia",
+            "image": path,
+        }
+        for index, path in enumerate(sorted(fixtures.glob("person_*")))
+    ]
+
+
+@case("committee.build_all")
+def _committee(fixtures: Path, scratch: Path):
+    import create_committee_collages as module
+
+    people = _committee_roster(fixtures)
+
+    def run():
+        _cold_cache(module, "committee", scratch)
+        return module.build_all(people, scratch / "committee")
+
+    return run
+
+
+@case("committee.build_wall")
+def _committee_wall(fixtures: Path, scratch: Path):
+    import create_committee_collages as module
+
+    people = _committee_roster(fixtures)
+
+    def run():
+        _cold_cache(module, "committee", scratch)
+        return module.build_wall(people, scratch / "committee_wall.png")
+
+    return run
+
+
+@case("keynote.build_collage")
+def _keynote(fixtures: Path, scratch: Path):
+    import create_keynote_collage as module
+
+    module.KEYNOTE_IMAGES = sorted(fixtures.glob("person_*"))[:8]
+
+    def run():
+        _cold_cache(module, "keynote", scratch)
+        return module.build_collage(scratch / "keynotes_collage.png")
+
+    return run
+
+
+@case("sponsors.main")
+def _sponsors(fixtures: Path, scratch: Path):
+    import create_sponsor_collages as module
+
+    logos = [fixtures / "logo_large.png", fixtures / "logo_gradient_src.png"] + sorted(fixtures.glob("logo_*.svg"))
+    module.TIERS = [
+        module.TierConfig("Gold Sponsors", columns=4, logos=logos[:4], output=scratch / "gold.png"),
+        module.TierConfig("Silver Sponsors", columns=3, logos=logos[4:], output=scratch / "silver.png"),
+    ]
+
+    def run():
+        _cold_cache(module, "sponsor", scratch)
+        outputs = [module.build_tier_collage(tier) for tier in module.TIERS]
+        outputs.append(module.build_combined_collage(module.TIERS, scratch / "all.png"))
+        return outputs
+
+    return run
+
+
+SVG_CASES = {"prepare_logo[svg]", "convert_svg_to_png", "sponsors.main"}
+
+
+# --------- Runner ---------
+def _peak_rss_mb() -> float:
+    # VmHWM is per address space; ru_maxrss survives exec on Linux and would report the parent's peak.
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def _child(name: str, fixtures: str, repeat: int, queue) -> None:
+    import contextlib
+    import io
+
+    sys.path.insert(0, str(ROOT))
+    with tempfile.TemporaryDirectory() as scratch:
+        run = CASES[name](Path(fixtures), Path(scratch))
+        rss_before = _peak_rss_mb()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):  # the scripts print progress
+                run()
+            times.append(time.perf_counter() - start)
+    peak = _peak_rss_mb()
+    queue.put({"runs_s": times, "peak_rss_mb": round(peak, 1), "rss_growth_mb": round(peak - rss_before, 1)})
+
+
+def run_case(name: str, fixtures: Path, repeat: int) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(name, str(fixtures), repeat, queue))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        return {"error": f"exit code {proc.exitcode}"}
+    result = queue.get()
+    runs = result["runs_s"]
+    result.update(wall_s=round(statistics.median(runs), 4), wall_min_s=round(min(runs), 4))
+    result["runs_s"] = [round(t, 4) for t in runs]
+    return result
+
+
+def run_all(names: List[str], repeat: int, fixtures: Optional[Path] = None) -> Dict[str, Any]:
+    import PIL
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture_dir = make_fixtures(fixtures or Path(tmp) / "fixtures")
+        for name in names:
+            if name in SVG_CASES and not _has_cairosvg():
+                results[name] = {"skipped": "cairosvg unavailable"}
+                print(f"  {name:<34} skipped ({results[name]['skipped']})")
+                continue
+            result = results[name] = run_case(name, fixture_dir, repeat)
+            if "error" in result:
+                print(f"  {name:<34} FAILED ({result['error']})")
+            else:
+                print(f"  {name:<34} {result['wall_s'] * 1000:>9.1f} ms  {result['peak_rss_mb']:>7.1f} MB peak")
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "machine": platform.platform(),
+            "repeat": repeat,
+            "selected": names,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a side-by-side table of the cases selected in `current` and return the names of regressed ones.
+
+    A case that ran cleanly in the baseline but now errors, or was selected and left no result, counts as a
+    regression. Cases skipped in this run are listed as skipped; baseline cases that were not selected
+    (`-k`) are only counted.
+    """
+    regressions = []
+    selected = current["meta"].get("selected", list(current["results"]))
+    print(f"{'case':<36}{'base ms':>10}{'now ms':>10}{'Δ time':>9}{'base MB':>10}{'now MB':>9}{'Δ rss':>8}")
+    for name in selected:
+        base = baseline["results"].get(name)
+        now = current["results"].get(name)
+        if now and "skipped" in now:
+            print(f"{name:<36}{'':>10}  skipped ({now['skipped']})")
+            continue
+        if not base or "wall_s" not in base:
+            now_ms = f"{now['wall_s'] * 1000:>10.1f}" if now and "wall_s" in now else f"{'—':>10}"
+            print(f"{name:<36}{'—':>10}{now_ms}")
+            continue
+        if not now or "error" in now:
+            regressions.append(name)
+            problem = f"ERROR: {now['error']}" if now else "MISSING"
+            print(f"{name:<36}{base['wall_s'] * 1000:>10.1f}  REGRESSION ({problem})")
+            continue
+        d_time = now["wall_s"] / base["wall_s"] - 1 if base["wall_s"] else 0.0
+        d_rss = now["peak_rss_mb"] / base["peak_rss_mb"] - 1 if base["peak_rss_mb"] else 0.0
+        flag = ""
+        if d_time > threshold or d_rss > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<36}{base['wall_s'] * 1000:>10.1f}{now['wall_s'] * 1000:>10.1f}{d_time:>+9.0%}"
+            f"{base['peak_rss_mb']:>10.1f}{now['peak_rss_mb']:>9.1f}{d_rss:>+8.0%}{flag}"
+        )
+    unselected = [name for name in baseline["results"] if name not in selected]
+    if unselected:
+        print(f"({len(unselected)} baseline case(s) not selected in this run)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m imaging bench", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    run_p = sub.add_parser("run", help="Run the benchmarks and write JSON results")
+    run_p.add_argument("-o", "--output", type=Path, default=RESULTS_PATH)
+    run_p.add_argument("-k", dest="filter", default="", help="Only run cases whose name contains this text")
+    run_p.add_argument("--repeat", type=int, default=3)
+    run_p.add_argument("--fixtures", type=Path, default=None, help="Keep the generated fixtures in this directory")
+    run_p.add_argument("--save-baseline", action="store_true", help=f"Also store the results as {BASELINE_PATH.relative_to(ROOT)}")
+
+    cmp_p = sub.add_parser("compare", help="Compare results against a baseline")
+    cmp_p.add_argument("baseline", type=Path, nargs="?", default=BASELINE_PATH)
+    cmp_p.add_argument("current", type=Path, nargs="?", default=RESULTS_PATH)
+    cmp_p.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown that counts as a regression")
+
+    args = parser.parse_args()
+
+    if args.action == "run":
+        names = [name for name in CASES if args.filter in name]
+        print(f"Running {len(names)} benchmarks ({args.repeat} runs each)...")
+        report = run_all(names, args.repeat, args.fixtures)
+        for path in [args.output] + ([BASELINE_PATH] if args.save_baseline else []):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + "\n")
+            print(f"Saved {path}")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) (threshold {args.threshold:.0%}, or now failing): {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo regressions above {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Decode sources to RGBA and fit them into fixed-size transparent cells."""
+
+from pathlib import Path
+from typing import Tuple
+
+from PIL import Image, ImageOps
+
+from imaging.trace import span
+
+Color = Tuple[int, int, int, int]
+TRANSPARENT: Color = (0, 0, 0, 0)
+
+
+def load_rgba(path: Path) -> Image.Image:
+    """Open a raster or SVG source as RGBA; SVGs are rasterised at their natural size."""
+    if path.suffix.lower() == ".svg":
+        from imaging.svg import svg_to_image
+
+        return svg_to_image(path).convert("RGBA")
+    with span("decode", file=path.name), Image.open(path) as img:
+        return img.convert("RGBA")
+
+
+def fit_cell(path: Path, size: Tuple[int, int], background: Color = TRANSPARENT) -> Image.Image:
+    """Centre-crop and scale the image to exactly `size` (headshots)."""
+    img = load_rgba(path)
+    with span("resample"):
+        fitted = ImageOps.fit(img, size, method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
+    with span("paste"):
+        cell = Image.new("RGBA", size, background)
+        cell.paste(fitted, (0, 0), mask=fitted)
+    return cell
+
+
+def contain_cell(path: Path, size: Tuple[int, int], margin: int, background: Color = TRANSPARENT) -> Image.Image:
+    """Scale the image to fit inside `size` minus `margin` on each side and centre it (logos)."""
+    inner = (size[0] - 2 * margin, size[1] - 2 * margin)
+    img = load_rgba(path)
+    with span("resample"):
+        fitted = ImageOps.contain(img, inner, method=Image.Resampling.LANCZOS)
+    with span("paste"):
+        cell = Image.new("RGBA", size, background)
+        offset = ((size[0] - fitted.width) // 2, (size[1] - fitted.height) // 2)
+        cell.paste(fitted, offset, mask=fitted)
+    return cell
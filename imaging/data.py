@@ -0,0 +1,123 @@
+"""Roster loading and per-cell render caching shared by the collage scripts.
+
+Rosters live in data/*.json. Each rendered cell is cached under .collage_cache/ by a fingerprint of
+everything that affects its pixels (roster fields, source image bytes, layout constants), so editing one
+entry re-renders exactly one cell and the page is re-composited from cached cells.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+
+from imaging import ROOT
+from imaging.trace import span
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+DATA_DIR = ROOT / "data"
+CACHE_DIR = ROOT / ".collage_cache"
+
+# Bump when the rendering code changes in a way the layout constants do not capture.
+CACHE_VERSION = 1
+
+_digests: Dict[Path, tuple] = {}
+
+
+def load_roster(name: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Load data/<name>.json, resolving every "image" field against the repository root.
+
+    A Path is read as is, for rosters kept outside data/ in the same format.
+    """
+    path = name if isinstance(name, Path) else DATA_DIR / f"{name}.json"
+    entries = json.loads(path.read_text(encoding="utf-8"))
+
+    def resolve(entry: Any) -> Any:
+        if isinstance(entry, list):
+            return [resolve(item) for item in entry]
+        if isinstance(entry, dict):
+            return {key: ROOT / value if key == "image" else resolve(value) for key, value in entry.items()}
+        return entry
+
+    return resolve(entries)
+
+
+def file_digest(path: Path) -> str:
+    """Content hash of a source image, memoised per (size, mtime) for the lifetime of the process."""
+    stat = path.stat()
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _digests.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    digest = hashlib.sha1(path.read_bytes()).hexdigest()
+    _digests[path] = (key, digest)
+    return digest
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serialisable parts; Paths are replaced by the digest of their contents."""
+
+    def normalise(value: Any) -> Any:
+        if isinstance(value, Path):
+            return {"file": value.name, "sha1": file_digest(value)}
+        if isinstance(value, dict):
+            return {str(k): normalise(v) for k, v in sorted(value.items())}
+        if isinstance(value, (list, tuple)):
+            return [normalise(v) for v in value]
+        return value
+
+    payload = json.dumps([CACHE_VERSION, normalise(list(parts))], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CellCache:
+    """PNG cache of rendered cells keyed by fingerprint, one directory per collage kind.
+
+    Safe to use from the loader threads in imaging.pipeline: lookups are counted under a lock, and each
+    thread writes its own temporary file before the atomic rename.
+    """
+
+    def __init__(self, kind: str, cache_dir: Path = CACHE_DIR) -> None:
+        self.dir = cache_dir / kind
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.dir / f"{key}.png"
+
+    def get(self, key: str) -> Optional["Image.Image"]:
+        from PIL import Image
+
+        path = self.path_for(key)
+        hit = path.exists()
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not hit:
+            return None
+        with span("cache", op="read"), Image.open(path) as img:
+            img.load()
+            return img
+
+    def put(self, key: str, cell: "Image.Image") -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / f"{key}.{threading.get_ident()}.tmp"
+        with span("cache", op="write"):
+            cell.save(tmp, format="PNG", compress_level=1)
+        tmp.replace(self.path_for(key))
+
+    def get_or_render(self, key: str, render: Callable[[], "Image.Image"]) -> "Image.Image":
+        cell = self.get(key)
+        if cell is not None:
+            return cell
+        cell = render()
+        self.put(key, cell)
+        return cell
+
+    def summary(self) -> str:
+        return f"{self.hits} cached, {self.misses} rendered"
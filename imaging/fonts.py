@@ -0,0 +1,20 @@
+"""Lazily loaded, cached caption fonts."""
+
+from functools import lru_cache
+
+from PIL import ImageFont
+
+
+@lru_cache(maxsize=None)
+def font_try_load(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
+    """Load a readable font once per (size, weight), falling back to Pillow's default."""
+    candidates = [
+        "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf",
+        "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf",
+    ]
+    for path in candidates:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
@@ -0,0 +1,22 @@
+"""Grid arithmetic shared by the collage layouts."""
+
+from math import ceil
+from typing import Tuple
+
+
+def row_count(items: int, columns: int) -> int:
+    return ceil(items / columns)
+
+
+def grid_size(rows: int, columns: int, cell: Tuple[int, int], pad_x: int, pad_y: int) -> Tuple[int, int]:
+    """Canvas size for `rows` x `columns` cells with padding around and between every cell."""
+    return (
+        columns * cell[0] + (columns + 1) * pad_x,
+        rows * cell[1] + (rows + 1) * pad_y,
+    )
+
+
+def cell_origin(index: int, columns: int, cell: Tuple[int, int], pad_x: int, pad_y: int) -> Tuple[int, int]:
+    """Top-left corner of cell `index`, filling rows left to right."""
+    row, col = divmod(index, columns)
+    return pad_x + col * (cell[0] + pad_x), pad_y + row * (cell[1] + pad_y)
@@ -0,0 +1,49 @@
+"""Bounded read-ahead for the collage builders: loader threads prepare upcoming cells while the caller pastes.
+
+`prefetch(load, items)` yields `load(item)` for every item in input order. Up to `ahead` loads are handed to
+a small thread pool before the caller asks for them. A new one is submitted only when the caller takes a
+result, so the queue of finished-but-unpasted cells never grows past `ahead`, however long the roster.
+Pillow releases the GIL while it decodes, resamples and encodes PNGs, so the loaders overlap with the
+pasting on the main thread. An exception raised by `load` surfaces at that item's position, as it would
+in a plain loop.
+
+IMAGING_LOADERS sets the number of loader threads; `IMAGING_LOADERS=0` runs everything serially on the
+calling thread.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+LOADERS = int(os.environ.get("IMAGING_LOADERS", min(4, os.cpu_count() or 1)))
+AHEAD = 8  # cells decoded ahead of the paste loop
+
+
+def prefetch(load: Callable[[T], R], items: Iterable[T], workers: Optional[int] = None, ahead: int = AHEAD) -> Iterator[R]:
+    """Yield `load(item)` for each item, in order, with at most `ahead` loads queued in front of the caller."""
+    workers = LOADERS if workers is None else workers
+    if workers <= 0:
+        yield from map(load, items)
+        return
+
+    source = iter(items)
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loader") as pool:
+        try:
+            for item in islice(source, max(ahead, 1)):
+                pending.append(pool.submit(load, item))
+            while pending:
+                result = pending.popleft().result()
+                # Refill before handing the result over, so the loaders stay busy while the caller pastes.
+                for item in islice(source, 1):
+                    pending.append(pool.submit(load, item))
+                yield result
+        finally:
+            # The caller stopped early or a load failed: drop the queued loads rather than finish them.
+            for future in pending:
+                future.cancel()
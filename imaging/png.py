@@ -0,0 +1,143 @@
+"""Streaming PNG writer for images too large to hold in memory at once.
+
+Pillow encodes a PNG from a complete in-memory image. `PNGStreamWriter` instead takes the image as a
+sequence of horizontal bands, filters and deflates each band as it arrives and writes IDAT chunks
+straight to disk, so peak memory is one band regardless of the final height. Each row gets the
+adaptive filter libpng uses by default (the one of None/Sub/Up/Average/Paeth with the smallest sum of
+absolute signed bytes), vectorised over the whole band with NumPy.
+"""
+
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from imaging.trace import span
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Colour type and bytes per pixel for the 8-bit modes we write.
+MODES = {"L": (0, 1), "RGB": (2, 3), "RGBA": (6, 4)}
+IDAT_SIZE = 1 << 20
+# Rows filtered per NumPy pass; the candidate filters need ~16 bytes of scratch per input byte.
+FILTER_ROWS = 32
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def filter_rows(rows: np.ndarray, prior: np.ndarray, bpp: int) -> np.ndarray:
+    """Filter a (height, stride) uint8 band; `prior` is the unfiltered row above the band (zeros at the top).
+
+    Returns (height, stride + 1) bytes with the chosen filter type prefixed to every row.
+    """
+    height, stride = rows.shape
+    x = rows
+    b = np.vstack([prior[None, :], x[:-1]])
+    a = np.zeros_like(x)
+    a[:, bpp:] = x[:, :-bpp]
+    c = np.zeros_like(x)
+    c[:, bpp:] = b[:, :-bpp]
+
+    # Paeth is the only filter that needs signed intermediates; the rest wrap modulo 256 in uint8.
+    a16, b16, c16 = a.astype(np.int16), b.astype(np.int16), c.astype(np.int16)
+    pa, pb, pc = np.abs(b16 - c16), np.abs(a16 - c16), np.abs(a16 + b16 - 2 * c16)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+    average = (a >> 1) + (b >> 1) + (a & b & 1)
+
+    candidates = np.empty((5, height, stride), dtype=np.uint8)
+    candidates[0] = x
+    np.subtract(x, a, out=candidates[1])
+    np.subtract(x, b, out=candidates[2])
+    np.subtract(x, average, out=candidates[3])
+    np.subtract(x, paeth, out=candidates[4])
+    # libpng's heuristic: treat filtered bytes as signed and minimise the sum of their magnitudes.
+    # abs() in int8 maps -128 to itself, which reads back as 128 in uint8, so no widening is needed.
+    magnitude = np.abs(candidates.view(np.int8)).view(np.uint8)
+    choice = magnitude.sum(axis=2, dtype=np.uint32).argmin(axis=0)
+
+    out = np.empty((height, stride + 1), dtype=np.uint8)
+    out[:, 0] = choice
+    out[:, 1:] = candidates[choice, np.arange(height)]
+    return out
+
+
+class PNGStreamWriter:
+    """Write a PNG of known size band by band: `with PNGStreamWriter(path, size) as png: png.write(band)`."""
+
+    def __init__(self, path: Path, size: Tuple[int, int], mode: str = "RGBA", compress_level: int = 6) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unsupported mode {mode!r}; expected one of {sorted(MODES)}")
+        self.path = Path(path)
+        # Rows go to a sibling file that replaces `path` only once the PNG is complete, so a failed or short
+        # write never leaves a truncated image behind or clobbers the previous one.
+        self._partial = self.path.with_name(self.path.name + ".part")
+        self.size = size
+        self.mode = mode
+        self.color_type, self.bpp = MODES[mode]
+        self.rows_written = 0
+        self._prior = np.zeros(size[0] * self.bpp, dtype=np.uint8)
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._file: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "PNGStreamWriter":
+        self._file = self._partial.open("wb")
+        width, height = self.size
+        self._file.write(SIGNATURE)
+        self._file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, self.color_type, 0, 0, 0)))
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        complete = False
+        try:
+            if exc_type is None:
+                self.close()
+                complete = True
+        finally:
+            self._file.close()
+            if complete:
+                self._partial.replace(self.path)
+            else:
+                self._partial.unlink(missing_ok=True)
+
+    def write(self, band: Image.Image) -> None:
+        """Append a full-width band of rows below everything written so far."""
+        if band.width != self.size[0]:
+            raise ValueError(f"Band width {band.width} does not match image width {self.size[0]}")
+        if self.rows_written + band.height > self.size[1]:
+            raise ValueError(f"Band overruns the image height {self.size[1]}")
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+        with span("encode", rows=band.height):
+            pixels = np.asarray(band, dtype=np.uint8).reshape(band.height, -1)
+            for start in range(0, band.height, FILTER_ROWS):
+                rows = pixels[start : start + FILTER_ROWS]
+                self._pending += self._compressor.compress(filter_rows(rows, self._prior, self.bpp).tobytes())
+                self._prior = rows[-1]
+                self._flush(IDAT_SIZE)
+            self._prior = self._prior.copy()
+        self.rows_written += band.height
+
+    def write_blank(self, height: int, color: Tuple[int, ...]) -> None:
+        """Append `height` rows of a solid colour (e.g. padding) without allocating them all at once."""
+        step = max(1, min(height, IDAT_SIZE // max(1, self.size[0] * self.bpp)))
+        for start in range(0, height, step):
+            self.write(Image.new(self.mode, (self.size[0], min(step, height - start)), color))
+
+    def close(self) -> None:
+        if self.rows_written != self.size[1]:
+            raise ValueError(f"Wrote {self.rows_written} rows of {self.size[1]}")
+        with span("encode"):
+            self._pending += self._compressor.flush()
+            self._flush(0)
+        self._file.write(_chunk(b"IEND", b""))
+
+    def _flush(self, threshold: int) -> None:
+        while self._pending and len(self._pending) >= threshold:
+            data = bytes(self._pending[:IDAT_SIZE])
+            del self._pending[:IDAT_SIZE]
+            self._file.write(_chunk(b"IDAT", data))
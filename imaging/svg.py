@@ -0,0 +1,62 @@
+"""SVG rasterisation. CairoSVG is imported on first use so scripts that never touch an SVG do not pay for it."""
+
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Union
+
+from imaging.trace import span
+
+PathLike = Union[str, Path]
+
+
+def require_cairosvg():
+    """Import CairoSVG, raising ImportError with install advice; CLIs turn that into their exit."""
+    try:
+        import cairosvg
+    except (ImportError, OSError) as exc:  # OSError: the Python package is installed but libcairo is not
+        raise ImportError("cairosvg library not found! Please install it using: pip install cairosvg") from exc
+    return cairosvg
+
+
+def render_svg(svg_path: PathLike, png_path: Optional[PathLike] = None, **options) -> Optional[bytes]:
+    """Rasterise `svg_path` with CairoSVG options; returns PNG bytes when `png_path` is None."""
+    cairosvg = require_cairosvg()
+    write_to = str(png_path) if png_path is not None else None
+    # Pass the path rather than the bytes so relative hrefs inside the SVG resolve against its folder.
+    with span("rasterize", file=Path(svg_path).name):
+        return cairosvg.svg2png(url=str(svg_path), write_to=write_to, **options)
+
+
+def svg_to_image(svg_path: PathLike, **options):
+    """Rasterise an SVG straight into a Pillow image without touching disk."""
+    from PIL import Image
+
+    png_bytes = render_svg(svg_path, **options)
+    with span("decode", file=Path(svg_path).name):
+        img = Image.open(BytesIO(png_bytes))
+        img.load()
+    return img
+
+
+def convert_svg_to_png(svg_path, png_path, width=None, height=None, dpi=300, scale=None) -> bool:
+    """
+    Convert an SVG file to PNG, printing the outcome.
+
+    Args:
+        svg_path (str): Path to input SVG file
+        png_path (str): Path to output PNG file
+        width (int, optional): Width in pixels
+        height (int, optional): Height in pixels
+        dpi (int): DPI for output image (default: 300)
+        scale (float, optional): Render scale multiplier, used when no width/height is given
+    """
+    options = {"output_width": width, "output_height": height, "dpi": dpi}
+    if scale is not None:
+        options["scale"] = scale
+    try:
+        render_svg(svg_path, png_path, **options)
+        print(f"✅ Converted: {svg_path} -> {png_path}")
+        return True
+    except Exception as e:
+        print(f"❌ Error converting {svg_path}: {str(e)}")
+        return False
@@ -0,0 +1,130 @@
+"""Cached text measurement and line breaking for collage captions and labels.
+
+Word widths are memoised per (font file, size) and whole layouts per (text, font, max width), so repeated
+captions such as "Publicity Chair" are measured once per build. Line breaking sums cached word widths and
+only falls back to measuring the full trial line near the wrap limit, where kerning could tip the result.
+Drawing works the same way: each distinct line is rasterised once per font and subpixel offset into a
+coverage mask, and every cell that shows it (a shared role or affiliation) pastes that mask.
+"""
+
+import math
+import os
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from imaging.trace import span
+
+Line = Tuple[str, float]  # text and its rendered width
+
+_word_widths: Dict[Tuple[Hashable, str], float] = {}
+_layouts: Dict[Tuple[str, Hashable, int], List[Line]] = {}
+_masks: Dict[Tuple[Hashable, str, Tuple[float, float]], Optional[Tuple[Image.Image, Tuple[int, int]]]] = {}
+
+
+def font_key(font: ImageFont.ImageFont) -> Hashable:
+    """Identify a font by file and size so separately loaded copies share cache entries."""
+    path = getattr(font, "path", None)
+    if isinstance(path, (str, os.PathLike)):
+        return (os.fspath(path), font.size, font.index)
+    if hasattr(font, "getname"):  # in-memory font such as Pillow's bundled default
+        return (font.getname(), getattr(font, "size", None))
+    return ("id", id(font))
+
+
+def text_width(font: ImageFont.ImageFont, text: str) -> float:
+    """Memoised `font.getlength`; used for single words and for labels drawn repeatedly."""
+    key = (font_key(font), text)
+    width = _word_widths.get(key)
+    if width is None:
+        width = _word_widths[key] = font.getlength(text)
+    return width
+
+
+def layout_lines(text: str, font: ImageFont.ImageFont, max_width: int) -> List[Line]:
+    """Greedy word wrap returning each line with its width; identical to measuring every trial line."""
+    key = (text, font_key(font), max_width)
+    cached = _layouts.get(key)
+    if cached is not None:
+        return cached
+
+    # Kerning across a join is at most a fraction of the em size; outside this band the estimate is decisive.
+    slack = max(2.0, getattr(font, "size", 10) * 0.25)
+    space = text_width(font, " ")
+    lines: List[Line] = []
+    current, current_width = "", 0.0
+    for word in text.split():
+        if not current:
+            current, current_width = word, text_width(font, word)
+            continue
+        estimate = current_width + space + text_width(font, word)
+        trial = current + " " + word
+        if abs(estimate - max_width) <= slack:
+            estimate = font.getlength(trial)
+        if estimate <= max_width:
+            current, current_width = trial, estimate
+        else:
+            lines.append((current, font.getlength(current)))
+            current, current_width = word, text_width(font, word)
+    if current:
+        lines.append((current, font.getlength(current)))
+
+    _layouts[key] = lines
+    return lines
+
+
+def wrap_text(text: str, font: ImageFont.ImageFont, max_width: int) -> List[str]:
+    return [line for line, _ in layout_lines(text, font, max_width)]
+
+
+def line_mask(font: ImageFont.ImageFont, text: str, start: Tuple[float, float]) -> Optional[Tuple[Image.Image, Tuple[int, int]]]:
+    """Coverage mask of `text` drawn at the subpixel offset `start`, with its offset from the integer origin.
+
+    None for text that leaves no ink. Filling a colour through this mask is exactly what `ImageDraw.text`
+    does, so pasting it matches drawing the line in place.
+    """
+    key = (font_key(font), text, start)
+    if key in _masks:
+        return _masks[key]
+    size = int(getattr(font, "size", 10))
+    margin = 2 * size  # room for bearings and accents outside the advance box
+    canvas = Image.new("L", (math.ceil(text_width(font, text)) + 2 * margin, 3 * size + 2 * margin))
+    ImageDraw.Draw(canvas).text((margin + start[0], margin + start[1]), text, font=font, fill=255)
+    bbox = canvas.getbbox()
+    _masks[key] = None if bbox is None else (canvas.crop(bbox), (bbox[0] - margin, bbox[1] - margin))
+    return _masks[key]
+
+
+def draw_lines(
+    canvas: Image.Image,
+    lines: Sequence[Line],
+    font: ImageFont.ImageFont,
+    box: Tuple[int, int],
+    y: float,
+    fill: Tuple[int, int, int, int],
+    line_step: int,
+) -> float:
+    """Draw pre-measured lines centred in the horizontal span `box` = (left, width); return the next y."""
+    left, width = box
+    with span("text"):
+        for line, line_width in lines:
+            x = left + (width - line_width) / 2
+            rendered = line_mask(font, line, (math.modf(x)[0], math.modf(y)[0]))
+            if rendered is not None:
+                mask, (dx, dy) = rendered
+                origin = (int(x) + dx, int(y) + dy)
+                canvas.paste(fill, (*origin, origin[0] + mask.width, origin[1] + mask.height), mask)
+            y += line_step
+    return y
+
+
+def draw_centered(
+    canvas: Image.Image,
+    text: str,
+    font: ImageFont.ImageFont,
+    box: Tuple[int, int],
+    y: float,
+    fill: Tuple[int, int, int, int],
+) -> None:
+    """Draw a single label centred in `box` = (left, width) without wrapping."""
+    draw_lines(canvas, [(text, text_width(font, text))], font, box, y, fill, 0)
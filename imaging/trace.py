@@ -0,0 +1,176 @@
+"""Low-overhead stage timers with Chrome-trace / Perfetto export.
+
+Wrap work in `with span("decode"):` (or decorate with `@traced("encode")`). Tracing is off unless
+`enable()` is called, the CLI gets `--trace out.json`, or the IMAGING_TRACE environment variable names an
+output file. When off, `span()` returns a shared no-op context manager and records nothing. Work sent to
+a process pool is traced only when it goes through `pool_map`.
+
+On exit the recorded spans are written as a Chrome trace (open in ui.perfetto.dev or chrome://tracing)
+and a per-stage summary table is printed.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Stages reported in the summary; spans in other categories (e.g. "build") only appear in the trace.
+STAGES = ("decode", "rasterize", "resample", "recolor", "text", "paste", "encode", "cache")
+
+_NULL = nullcontext()
+# (name, category, start ns, duration ns, (pid, thread ident, thread name), args)
+_events: List[Tuple[str, str, int, int, Tuple[int, int, str], Optional[Dict[str, Any]]]] = []
+_output: Optional[Path] = None
+_origin_ns = 0
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name: str, cat: str, args: Optional[Dict[str, Any]]) -> None:
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter_ns()
+        # list.append is atomic under the GIL, so loader threads can record without a lock.
+        track = (os.getpid(), threading.get_ident(), threading.current_thread().name)
+        _events.append((self.name, self.cat, self.start, end - self.start, track, self.args))
+
+
+def enabled() -> bool:
+    return _output is not None
+
+
+def span(name: str, cat: str = "stage", **args: Any):
+    """Time a block as one trace event; a no-op when tracing is disabled."""
+    if _output is None:
+        return _NULL
+    return _Span(name, cat, args or None)
+
+
+def traced(name: str, cat: str = "stage") -> Callable:
+    """Decorator form of `span`."""
+
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _output is None:
+                return func(*args, **kwargs)
+            with _Span(name, cat, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def pool_map(pool: Executor, func: Callable, jobs: Iterable) -> Iterator:
+    """`pool.map(func, jobs)` for a process pool, bringing the spans each job records back into this trace.
+
+    Spans recorded in a worker process would otherwise die with it. perf_counter_ns reads a system-wide
+    monotonic clock, so worker timestamps line up with the parent's.
+    """
+    if _output is None:
+        return pool.map(func, jobs)
+    return _merged(pool.map(_run_recorded, [(func, job) for job in jobs]))
+
+
+def _merged(results: Iterable[Tuple[Any, List]]) -> Iterator:
+    for result, events in results:
+        _events.extend(events)
+        yield result
+
+
+def _run_recorded(task: Tuple[Callable, Any]) -> Tuple[Any, List]:
+    """Worker half of `pool_map`: run one job with recording on and hand back its result and spans."""
+    global _output
+    func, job = task
+    previous = _output
+    _output = previous or Path(os.devnull)  # record without registering the exit-time writer
+    start = len(_events)
+    try:
+        return func(job), _events[start:]
+    finally:
+        del _events[start:]
+        _output = previous
+
+
+def enable(output: Path) -> None:
+    """Start recording; the trace is written to `output` when the process exits."""
+    global _output, _origin_ns
+    if _output is None:
+        atexit.register(_finish)
+        _origin_ns = time.perf_counter_ns()
+    _output = Path(output)
+
+
+def write_trace(path: Path) -> None:
+    pid, main = os.getpid(), threading.main_thread().ident
+    # The main thread is track 0 wherever it falls in the event order; other threads keep their own names.
+    tracks = sorted(dict.fromkeys(event[4] for event in _events), key=lambda track: track[:2] != (pid, main))
+    threads = {track: index for index, track in enumerate(tracks)}
+    trace_events = [
+        {"name": "thread_name", "ph": "M", "pid": track[0], "tid": index, "args": {"name": "main" if track[:2] == (pid, main) else track[2]}}
+        for track, index in threads.items()
+    ]
+    trace_events += [
+        {"name": "process_name", "ph": "M", "pid": worker, "args": {"name": f"worker process {worker}"}}
+        for worker in sorted({track[0] for track in threads} - {pid})
+    ]
+    for name, cat, start, duration, track, args in _events:
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - _origin_ns) / 1000,
+            "dur": duration / 1000,
+            "pid": track[0],
+            "tid": threads[track],
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        trace_events.append(event)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": trace_events, "displayTimeUnit": "ms"}))
+
+
+def summary() -> str:
+    totals: Dict[str, List[float]] = {}
+    for name, cat, _, duration, _, _ in _events:
+        if cat == "stage":
+            totals.setdefault(name, []).append(duration / 1e6)
+    wall = (time.perf_counter_ns() - _origin_ns) / 1e6
+    order = sorted(totals, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES))
+    lines = [f"{'stage':<12}{'calls':>7}{'total ms':>11}{'mean ms':>10}{'max ms':>10}{'% wall':>8}"]
+    for stage in order:
+        times = totals[stage]
+        total = sum(times)
+        lines.append(
+            f"{stage:<12}{len(times):>7}{total:>11.1f}{total / len(times):>10.2f}{max(times):>10.1f}{100 * total / wall:>7.1f}%"
+        )
+    lines.append(f"{'wall':<12}{'':>7}{wall:>11.1f}")
+    return "\n".join(lines)
+
+
+def _finish() -> None:
+    if _output is None or not _events:
+        return
+    write_trace(_output)
+    print(f"\nTrace: {_output} ({len(_events)} spans)")
+    print(summary())
+
+
+if os.environ.get("IMAGING_TRACE"):
+    enable(Path(os.environ["IMAGING_TRACE"]))
@@ -0,0 +1,314 @@
+"""Normalise committee and speaker photos: apply EXIF orientation, cap resolution, convert to sRGB, strip metadata.
+
+Every source under imgs/portraits/ is decoded once and written to the output folder. Files keep their
+person's name in a canonical form: lower case, underscores, one suffix. So `Tongliang-Liu.jpg` becomes
+`tongliang_liu.jpg` and `ibrahim.jpg.webp` becomes `ibrahim.jpg`. Opaque photos are saved as JPEG
+(progressive only from PROGRESSIVE_MIN_EDGE up, since it decodes more slowly). Photos with real transparency
+stay PNG. A photo that needs no resize, rotation or colour conversion keeps its own encoding, minus any
+metadata, when re-encoding would not make it smaller.
+
+A manifest in the output folder records each source's content hash, the settings used (including this
+script's own hash) and the name it was given. Unchanged photos are skipped on the next run, and names are
+reused, so adding a photo never renames one ingested earlier. The report lists bytes and decode time
+before and after.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageCms, ImageOps, JpegImagePlugin
+
+from imaging import ROOT
+from imaging.data import file_digest
+from imaging.trace import pool_map, span
+
+SOURCE_DIR = ROOT / "imgs" / "portraits"
+OUTPUT_DIR = ROOT / "imgs" / "portraits_ingested"
+MANIFEST_NAME = "manifest.json"
+TOOL_DIGEST = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()[:12]  # a change here re-processes every photo
+
+MAX_EDGE = 1024  # collages use 320 px headshots and the pages show 150 px, so 1024 leaves room for 2x/3x
+JPEG_QUALITY = 85
+ORIENTATION_TAG = 0x0112
+# Progressive JPEGs decode about twice as slowly; only the biggest photos gain from drawing early.
+PROGRESSIVE_MIN_EDGE = 1024
+METADATA_KEYS = {"exif", "icc_profile", "xmp", "XML:com.adobe.xmp", "comment", "photoshop"}
+_KEPT_APP = {0xE0: b"JFIF\0", 0xEE: b"Adobe"}  # APPn segments that affect decoding, by their identifier
+RASTER_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".bmp", ".tif", ".tiff"}
+
+_SRGB = None
+
+
+def canonical_stem(path: Path) -> str:
+    """`Tongliang-Liu.jpg` -> `tongliang_liu`, `chang_xu.png.jpg` -> `chang_xu`."""
+    stem = path.name
+    while Path(stem).suffix.lower() in RASTER_SUFFIXES:
+        stem = Path(stem).stem
+    ascii_stem = unicodedata.normalize("NFKD", stem).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "_", ascii_stem.lower()).strip("_") or "portrait"
+
+
+def to_srgb(img: Image.Image) -> Image.Image:
+    """Convert through the embedded ICC profile (if any) to sRGB; pixels without a profile are assumed sRGB."""
+    global _SRGB
+    icc = img.info.get("icc_profile")
+    if not icc:
+        return img
+    if _SRGB is None:
+        _SRGB = ImageCms.createProfile("sRGB")
+    try:
+        source = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+        mode = "RGBA" if img.mode in ("RGBA", "LA", "PA") else "RGB"
+        return ImageCms.profileToProfile(img, source, _SRGB, outputMode=mode)
+    except (ImageCms.PyCMSError, OSError, ValueError):
+        return img  # a broken profile is better dropped than trusted
+
+
+def _has_transparency(img: Image.Image) -> bool:
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        alpha = img.convert("RGBA").getchannel("A")
+        return alpha.getextrema()[0] < 255
+    return False
+
+
+def _decode_ms(data: bytes) -> float:
+    start = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+    return (time.perf_counter() - start) * 1000
+
+
+def _is_srgb(icc: bytes) -> bool:
+    try:
+        return "srgb" in ImageCms.getProfileDescription(ImageCms.ImageCmsProfile(io.BytesIO(icc))).lower()
+    except (ImageCms.PyCMSError, OSError, ValueError):
+        return False
+
+
+def strip_jpeg_metadata(data: bytes) -> bytes:
+    """The JPEG without its APPn and COM segments (JFIF and Adobe colour-transform markers stay); the
+    compressed image data is copied byte for byte, so the pixels are unchanged."""
+    out = bytearray(data[:2])
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0xDA:  # start of scan: everything from here on is image data
+            return bytes(out + data[pos:])
+        end = pos + 2 + int.from_bytes(data[pos + 2 : pos + 4], "big")
+        segment = data[pos:end]
+        if marker in _KEPT_APP:
+            metadata = not segment[4:].startswith(_KEPT_APP[marker])  # e.g. a JFXX thumbnail in APP0
+        else:
+            metadata = marker == 0xFE or 0xE0 <= marker <= 0xEF
+        if not metadata:
+            out += segment
+        pos = end
+    raise ValueError("no JPEG image data found")
+
+
+def source_without_metadata(original: Image.Image, data: bytes) -> Optional[Tuple[bytes, str]]:
+    """(bytes, suffix) to keep the source's own encoding, or None when its pixels need converting.
+
+    JPEGs lose their metadata segments losslessly. PNG and WebP are kept only when they carry none.
+    Either way an embedded profile must already be sRGB, since dropping anything else shifts colours.
+    """
+    icc = original.info.get("icc_profile")
+    if original.mode not in ("RGB", "RGBA", "L") or (icc and not _is_srgb(icc)):
+        return None
+    if original.format == "JPEG":
+        return strip_jpeg_metadata(data), ".jpg"
+    if original.format in ("PNG", "WEBP") and not (METADATA_KEYS & set(original.info) or getattr(original, "text", None)):
+        return data, f".{original.format.lower()}"
+    return None
+
+
+def ingest_one(source: Path, target_stem: Path, max_edge: int, quality: int) -> Dict:
+    """Normalise one photo and return its report entry; `target_stem` gets the suffix of the chosen format."""
+    data = source.read_bytes()
+    before_ms = _decode_ms(data)
+
+    with span("decode", file=source.name):
+        original = Image.open(io.BytesIO(data))
+        original.seek(0)
+        original.load()
+    img = ImageOps.exif_transpose(original)
+    if img.mode not in ("RGB", "RGBA", "L", "CMYK"):
+        img = img.convert("RGBA" if _has_transparency(img) else "RGB")
+    img = to_srgb(img)
+    transparent = _has_transparency(img)
+    img = img.convert("RGBA" if transparent else "RGB")
+
+    resized = max(img.size) > max_edge
+    if resized:
+        with span("resample", file=source.name):
+            img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    # A fresh image carries no EXIF, XMP, ICC or text chunks from the source.
+    clean = Image.frombytes(img.mode, img.size, img.tobytes())
+    buffer = io.BytesIO()
+    with span("encode", file=source.name):
+        if transparent:
+            clean.save(buffer, format="PNG", optimize=True)
+        else:
+            progressive = max(clean.size) >= PROGRESSIVE_MIN_EDGE
+            clean.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=progressive, subsampling="4:2:0")
+            if original.format == "JPEG":
+                # A JPEG already compressed harder than `quality` would grow; its own tables avoid that.
+                own = io.BytesIO()
+                sampling = JpegImagePlugin.get_sampling(original)
+                clean.save(own, format="JPEG", qtables=original.quantization, subsampling=sampling, optimize=True, progressive=progressive)
+                if own.tell() < buffer.tell():
+                    buffer = own
+    encoded, suffix = buffer.getvalue(), ".png" if transparent else ".jpg"
+
+    # A photo that needed no pixel changes keeps its own encoding when that is no bigger, less any metadata.
+    if not resized and original.getexif().get(ORIENTATION_TAG, 1) == 1:
+        kept = source_without_metadata(original, data)
+        if kept is not None and len(kept[0]) <= len(encoded):
+            encoded, suffix = kept
+    output = target_stem.with_suffix(suffix)
+    output.write_bytes(encoded)
+
+    return {
+        "source": source.name,
+        "output": output.name,
+        "size": list(clean.size),
+        "bytes_before": len(data),
+        "bytes_after": len(encoded),
+        "decode_ms_before": round(before_ms, 2),
+        "decode_ms_after": round(_decode_ms(encoded), 2),
+    }
+
+
+def _ingest_job(job: tuple) -> Dict:
+    source, target_stem, max_edge, quality = job
+    try:
+        return ingest_one(source, target_stem, max_edge, quality)
+    except Exception as exc:  # corrupt file or codec without a plugin; report it and carry on
+        return {"source": source.name, "error": str(exc)}
+
+
+def plan_names(sources: List[Path], assigned: Dict[str, str]) -> Dict[Path, str]:
+    """Canonical stem per source, keeping the stems in `assigned` (source name -> stem from the manifest).
+
+    A new source whose stem is taken gets the first free `_2`, `_3`, ... so nothing is overwritten and
+    adding a photo never renames one that was ingested earlier.
+    """
+    names = {source: assigned[source.name] for source in sources if source.name in assigned}
+    taken = set(names.values())
+    for source in sources:
+        if source in names:
+            continue
+        stem = name = canonical_stem(source)
+        count = 1
+        while name in taken:
+            count += 1
+            name = f"{stem}_{count}"
+        taken.add(name)
+        names[source] = name
+    return names
+
+
+def load_manifest(output_dir: Path) -> Dict[str, Dict]:
+    try:
+        return json.loads((output_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def ingest(
+    source_dir: Path = SOURCE_DIR,
+    output_dir: Path = OUTPUT_DIR,
+    max_edge: int = MAX_EDGE,
+    quality: int = JPEG_QUALITY,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> List[Dict]:
+    sources = sorted(p for p in source_dir.iterdir() if p.is_file() and p.suffix.lower() in RASTER_SUFFIXES)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    names = plan_names(sources, {name: Path(entry["output"]).stem for name, entry in manifest.items() if "output" in entry})
+
+    settings = {"max_edge": max_edge, "quality": quality, "tool": TOOL_DIGEST}
+    entries: Dict[str, Dict] = {}
+    jobs = []
+    for source in sources:
+        digest = file_digest(source)
+        previous = manifest.get(source.name)
+        if (
+            not force
+            and previous
+            and previous.get("sha1") == digest
+            and previous.get("settings") == settings
+            and (output_dir / previous.get("output", "")).is_file()
+        ):
+            entries[source.name] = {**previous, "skipped": True}
+        else:
+            jobs.append((source, output_dir / names[source], max_edge, quality))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (source, *_), result in zip(jobs, pool_map(pool, _ingest_job, jobs)):
+                if "error" not in result:
+                    result.update(sha1=file_digest(source), settings=settings)
+                entries[source.name] = result
+
+    (output_dir / MANIFEST_NAME).write_text(
+        json.dumps({name: {k: v for k, v in entry.items() if k != "skipped"} for name, entry in sorted(entries.items())
+                    if "error" not in entry}, indent=1)
+    )
+    return [entries[source.name] for source in sources]
+
+
+def report(entries: List[Dict]) -> None:
+    done = [e for e in entries if "error" not in e]
+    print(f"{'source':<36}{'output':<28}{'size':>11}{'KB before':>11}{'KB after':>10}{'ms before':>11}{'ms after':>10}")
+    for entry in entries:
+        if "error" in entry:
+            print(f"{entry['source']:<36}ERROR: {entry['error']}")
+            continue
+        size = "x".join(map(str, entry["size"]))
+        skipped = "  (unchanged)" if entry.get("skipped") else ""
+        print(
+            f"{entry['source']:<36}{entry['output']:<28}{size:>11}{entry['bytes_before'] / 1024:>11.1f}"
+            f"{entry['bytes_after'] / 1024:>10.1f}{entry['decode_ms_before']:>11.1f}{entry['decode_ms_after']:>10.1f}{skipped}"
+        )
+    before = sum(e["bytes_before"] for e in done)
+    after = sum(e["bytes_after"] for e in done)
+    decode_before = sum(e["decode_ms_before"] for e in done)
+    decode_after = sum(e["decode_ms_after"] for e in done)
+    if done:
+        print(
+            f"\n{len(done)} photos: {before / 1024:.0f} KB -> {after / 1024:.0f} KB ({100 * (1 - after / before):.0f}% smaller), "
+            f"decode {decode_before:.0f} ms -> {decode_after:.0f} ms"
+        )
+    renamed = [e for e in done if Path(e["output"]).stem != Path(e["source"]).stem]
+    if renamed:
+        print(f"{len(renamed)} renamed; see the manifest for the full source -> output map.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source-dir", type=Path, default=SOURCE_DIR)
+    parser.add_argument("-o", "--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--max-edge", type=int, default=MAX_EDGE, help=f"cap on the long edge in pixels (default: {MAX_EDGE})")
+    parser.add_argument("--quality", type=int, default=JPEG_QUALITY, help=f"JPEG quality (default: {JPEG_QUALITY})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-process photos the manifest says are unchanged")
+    args = parser.parse_args()
+    report(ingest(args.source_dir, args.output_dir, args.max_edge, args.quality, args.workers, args.force))
+
+
+if __name__ == "__main__":
+    main()
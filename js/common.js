@@ -401,4 +401,13 @@ function resetIframe()
     {
         iframe.style.height = '64px';
     }
-}
\ No newline at end of file
+}
+
+// Offline support for conference days; sw.js is generated by `python -m sitetools sw`.
+if ('serviceWorker' in navigator)
+{
+    window.addEventListener('load', function ()
+    {
+        navigator.serviceWorker.register('/sw.js');
+    });
+}
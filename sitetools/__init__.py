@@ -0,0 +1,9 @@
+"""Build and analysis tools for the static site itself (pages, CSS, JS), as opposed to the image assets.
+
+Run `python -m sitetools --help` for the CLI. Like `imaging`, submodules are imported only by the
+command that needs them.
+"""
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
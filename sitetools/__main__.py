@@ -0,0 +1,37 @@
+"""Single entry point for the site tools: `python -m sitetools <command> [args...]`.
+
+Each command maps to a module's `main()`, imported only when its command runs.
+"""
+
+import argparse
+import importlib
+import sys
+from typing import Dict, List, Optional, Tuple
+
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "waterfall": ("sitetools.waterfall", "Simulate page loads on a slow network and report the critical path"),
+    "sw": ("sitetools.serviceworker", "Regenerate sw.js and its precache list when the core pages change"),
+    "minify": ("sitetools.minify", "Minify every page into _site/, skipping pages that have not changed"),
+    "bundle": ("sitetools.bundle", "Bundle each page's local scripts into hashed files loaded with defer"),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog="python -m sitetools",
+        description=__doc__.splitlines()[0],
+        epilog="\n".join(f"  {name:<13} {help_text}" for name, (_, help_text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=sorted(COMMANDS), metavar="command", help="one of the commands below")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the command")
+    args = parser.parse_args(argv)
+
+    module_name, _ = COMMANDS[args.command]
+    sys.argv = [f"python -m sitetools {args.command}", *args.args]
+    importlib.import_module(module_name).main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Bundle each page's local scripts into one content-hashed file and load it with `defer`.
+
+    python -m sitetools bundle [--check]
+
+Pages are grouped by the ordered list of local scripts they load. Each group gets one bundle,
+js/bundles/<name>.<hash>.js: the sources minified (see sitetools.minify) and concatenated. The pages are
+rewritten in place to load the bundle. js/bundles/manifest.json maps every bundle back to its sources,
+so later runs recognise bundled pages, rebuild a bundle when a source changes, and delete a bundle once
+no page loads it. A run over a few pages keeps the bundles the other pages still load. `--check` fails
+when a page is out of date or loads a bundle that is missing or unknown to the manifest.
+
+A bundle gets `defer` unless that could change what the page does:
+
+- an inline script uses one of the bundle's globals outside a function body, which runs before a
+  deferred script would;
+- an inline script declares a name the bundle also declares (running the bundle later would flip which
+  definition wins);
+- the bundle calls `document.write`.
+
+Handlers such as `window.onload = ...` and `onclick="..."` attributes run after deferred scripts, so
+they do not block deferring. Third-party scripts are left alone and reported. Run `python -m sitetools sw`
+afterwards so the service worker precaches the new bundle.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from sitetools import ROOT
+from sitetools.minify import js_tokens, minify_js
+from sitetools.pages import SITE_ORIGIN, page_resources, resolve
+
+BUNDLE_DIR = ROOT / "js" / "bundles"
+MANIFEST_PATH = BUNDLE_DIR / "manifest.json"
+
+SCRIPT_TAG_RE = re.compile(r"""<script\b([^>]*?)\bsrc\s*=\s*(["'])([^"']+)\2([^>]*)>\s*</script>""", re.I)
+INLINE_SCRIPT_RE = re.compile(r"""<script\b([^>]*)>(.*?)</script>""", re.I | re.S)
+DEFER_RE = re.compile(r"""\s+defer(?:\s*=\s*(?:""|''|"defer"|'defer'|defer))?(?=[\s/>]|$)""", re.I)
+IDENT_RE = re.compile(r"[A-Za-z_$][\w$]*$")
+BLOCK_KEYWORDS = {"if", "for", "while", "switch", "catch", "with"}  # `(...) {` after these is not a function body
+DECLARATIONS = {"function", "class", "var", "let", "const"}
+STORED_AFTER = {"=", ":", "return", "default", "?", "||", "&&", "??"}  # a function after these is kept, not called
+SCHEDULERS = {"addEventListener", "setTimeout", "setInterval", "requestAnimationFrame", "requestIdleCallback", "then", "catch", "finally"}
+
+
+def _code_tokens(src: str) -> List[str]:
+    tokens: List[str] = []
+    for kind, text in js_tokens(src):
+        if kind != "code":
+            continue
+        if text == ">" and tokens and tokens[-1] == "=":
+            tokens[-1] = "=>"
+        else:
+            tokens.append(text)
+    return tokens
+
+
+def _runs_later(tokens: List[str], start: int, parens: List[int]) -> bool:
+    """Whether the function expression starting at tokens[start] is only stored or scheduled, not run now."""
+    before = tokens[start - 1] if start else ""
+    if before in ("", ";", "{", "}") and tokens[start] in ("function", "async"):
+        return True  # a declaration
+    if before in STORED_AFTER:
+        return True
+    if before in ("(", ",") and parens:
+        callee = tokens[parens[-1] - 1] if parens[-1] else ""
+        return callee in SCHEDULERS
+    return False  # an IIFE, or a callback to something like forEach that may run it at once
+
+
+def scan_js(src: str) -> Tuple[Set[str], Set[str]]:
+    """(names declared at the top level, identifiers used by code that runs as soon as the script does).
+
+    Code inside declared, assigned or scheduled functions (`function f() {...}`, `x.onload = function`,
+    `addEventListener(..., () => {...})`) runs later and is not counted. IIFEs and callbacks passed to other
+    calls are, since they may run at once.
+    """
+    tokens = _code_tokens(src)
+    declared: Set[str] = set()
+    immediate: Set[str] = set()
+    braces: List[bool] = []  # per open `{`: does the code inside it run later?
+    parens: List[int] = []  # indices of the open `(`
+    closed_paren = -1  # index of the `(` matching the last `)`
+    function_start: Optional[int] = None  # index of the `function` keyword whose body comes next
+    for index, text in enumerate(tokens):
+        later = bool(braces) and braces[-1]
+        previous = tokens[index - 1] if index else ""
+        if text == "(":
+            parens.append(index)
+        elif text == ")":
+            closed_paren = parens.pop() if parens else -1
+        elif text == "function":
+            function_start = index - 1 if previous == "async" else index
+        elif text == "{":
+            if previous == "=>":
+                params = closed_paren if tokens[index - 2] == ")" else index - 2
+                if params > 0 and tokens[params - 1] == "async":
+                    params -= 1
+                braces.append(later or _runs_later(tokens, params, parens))
+            elif previous == ")" and function_start is not None:
+                braces.append(later or _runs_later(tokens, function_start, parens))
+                function_start = None
+            elif previous == ")" and closed_paren > 0 and tokens[closed_paren - 1] not in BLOCK_KEYWORDS:
+                braces.append(True)  # method shorthand: `name(...) {`
+            else:
+                braces.append(later)  # a block or an object literal runs with its surroundings
+        elif text == "}":
+            if braces:
+                braces.pop()
+        elif IDENT_RE.match(text) and previous != ".":
+            if not braces and not parens and previous in DECLARATIONS:
+                declared.add(text)
+            elif not later:
+                immediate.add(text)
+    return declared, immediate
+
+
+def _is_js(attributes: str) -> bool:
+    match = re.search(r"""\btype\s*=\s*["']?([^"'\s>]*)""", attributes, re.I)
+    return not match or match.group(1).lower() in ("", "text/javascript", "application/javascript", "module")
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Dict[str, List[str]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def local_scripts(page: Path, html: str, manifest: Dict[str, List[str]]) -> List[Tuple[re.Match, List[str]]]:
+    """(tag match, source files) for each local script tag; a bundle tag expands to the bundle's sources."""
+    found = []
+    for match in SCRIPT_TAG_RE.finditer(html):
+        origin, path = resolve(match.group(3), page)
+        if origin != SITE_ORIGIN or path is None:
+            continue
+        name = Path(path).relative_to(ROOT).as_posix()
+        found.append((match, manifest.get(name, [name])))
+    return found
+
+
+def bundle_source(sources: List[str]) -> str:
+    parts = []
+    for name in sources:
+        text = minify_js((ROOT / name).read_text(encoding="utf-8"))
+        # A leading `;` stops a file that starts with `(` or `[` from continuing the previous one.
+        parts.append(f"/* {name} */\n;{text}\n")
+    return "".join(parts)
+
+
+def bundle_name(sources: List[str], text: str) -> str:
+    stem = "-".join(Path(name).stem for name in sources)
+    return f"{BUNDLE_DIR.relative_to(ROOT).as_posix()}/{stem}.{hashlib.sha1(text.encode('utf-8')).hexdigest()[:10]}.js"
+
+
+def defer_blockers(html: str, bundle_text: str) -> List[str]:
+    """Why deferring the bundle could change the page's behaviour (empty when it is safe)."""
+    declared, _ = scan_js(bundle_text)
+    reasons = []
+    if "document.write" in bundle_text:
+        reasons.append("bundle calls document.write")
+    for attributes, body in INLINE_SCRIPT_RE.findall(html):
+        if "src" in attributes.lower() or not _is_js(attributes) or not body.strip():
+            continue
+        inline_declared, inline_immediate = scan_js(body)
+        reasons += [f"inline script runs {name}() before the bundle" for name in sorted(declared & inline_immediate)]
+        reasons += [f"inline script redefines {name}" for name in sorted(declared & inline_declared)]
+    return reasons
+
+
+def _relative_src(original: str, target: str, page: Path) -> str:
+    """Point at `target` in the same style as `original` (root-relative, ./-relative or bare)."""
+    if original.startswith("/"):
+        return "/" + target
+    depth = len(page.parent.relative_to(ROOT).parts)
+    relative = "../" * depth + target
+    return "./" + relative if original.startswith("./") and not depth else relative
+
+
+def rewrite(page: Path, html: str, tags: List[Tuple[re.Match, List[str]]], bundle: str, defer: bool) -> str:
+    """Replace the first tag with the bundle and drop the others; the first tag's other attributes are kept."""
+    first, *rest = [match for match, _ in tags]
+    before, quote, src, after = (DEFER_RE.sub("", first.group(group)) for group in (1, 2, 3, 4))
+    replacement = f"<script{before.rstrip()} src={quote}{_relative_src(src, bundle, page)}{quote}{after.rstrip()}"
+    replacement += " defer></script>" if defer else "></script>"
+    out = []
+    pos = 0
+    for match in [first, *rest]:
+        out.append(html[pos : match.start()])
+        if match is first:
+            out.append(replacement)
+        pos = match.end()
+        if match is not first:
+            # Drop the rest of the line the removed tag stood on, if it is now empty.
+            line_end = html.find("\n", pos)
+            if line_end >= 0 and not html[pos:line_end].strip() and not out[-1].rsplit("\n", 1)[-1].strip():
+                out[-1] = out[-1].rstrip(" \t")
+                pos = line_end + 1
+    out.append(html[pos:])
+    return "".join(out)
+
+
+def blocking_scripts(page: Path) -> List[Tuple[str, int]]:
+    return [(r.url, r.bytes) for r in page_resources(page).walk() if r.kind == "script" and r.blocking and r.parent is not None and r.parent.parent is None]
+
+
+def plan(pages: List[Path]) -> Tuple[Dict[str, Dict], Dict[Path, str], List[str]]:
+    """Work out the bundles and the rewritten pages without writing anything.
+
+    Returns ({bundle: {"sources", "text", "pages", "deferred", "blocked"}}, {page: new html}, notes).
+    """
+    manifest = load_manifest()
+    bundles: Dict[str, Dict] = {}
+    rewritten: Dict[Path, str] = {}
+    notes: List[str] = []
+    texts: Dict[Tuple[str, ...], Tuple[str, str]] = {}
+    for page in pages:
+        html = page.read_bytes().decode("utf-8")  # not read_text: keep CRLF pages byte-for-byte
+        tags = local_scripts(page, html, manifest)
+        if not tags:
+            continue
+        sources = [name for _, names in tags for name in names]
+        missing = [name for name in sources if not (ROOT / name).is_file()]
+        if missing:
+            notes.append(f"{page.name}: not bundled, missing {', '.join(missing)}")
+            continue
+        key = tuple(sources)
+        if key not in texts:
+            text = bundle_source(sources)
+            texts[key] = (bundle_name(sources, text), text)
+        name, text = texts[key]
+        blockers = defer_blockers(html, text)
+        entry = bundles.setdefault(name, {"sources": sources, "text": text, "pages": [], "deferred": [], "blocked": {}})
+        entry["pages"].append(page.name)
+        if blockers:
+            entry["blocked"][page.name] = blockers
+        else:
+            entry["deferred"].append(page.name)
+        rewritten[page] = rewrite(page, html, tags, name, defer=not blockers)
+    return bundles, rewritten, notes
+
+
+def bundle_references(pages: List[Path]) -> Dict[Path, List[str]]:
+    """The js/bundles/ files each page loads, whether or not they exist."""
+    references: Dict[Path, List[str]] = {}
+    for page in pages:
+        for match in SCRIPT_TAG_RE.finditer(page.read_bytes().decode("utf-8")):
+            origin, path = resolve(match.group(3), page)
+            if origin == SITE_ORIGIN and path is not None and BUNDLE_DIR in path.parents:
+                references.setdefault(page, []).append(path.relative_to(ROOT).as_posix())
+    return references
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path, help="HTML pages (default: every top-level page)")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if any page or bundle is out of date instead of writing")
+    args = parser.parse_args()
+    site_pages = sorted(ROOT.glob("*.html"))
+    pages = [page.resolve() for page in args.pages] or site_pages
+    every_page = sorted(set(site_pages) | set(pages))
+
+    before = {page: blocking_scripts(page) for page in pages}
+    bundles, rewritten, notes = plan(pages)
+    changed = [page for page, html in rewritten.items() if html != page.read_bytes().decode("utf-8")]
+    stale = [name for name in bundles if not (ROOT / name).is_file()]
+    if args.check:
+        manifest = load_manifest()
+        problems = [f"{page.name} is out of date" for page in changed] + [f"{name} has not been written" for name in stale]
+        for page, names in bundle_references(every_page).items():
+            problems += [f"{page.name} loads missing {name}" for name in names if not (ROOT / name).is_file()]
+            problems += [f"{page.name} loads {name}, which is not in {MANIFEST_PATH.name}" for name in names if name not in manifest]
+        if problems:
+            print("\n".join(problems))
+            print("Run `python -m sitetools bundle` to bring them up to date")
+            sys.exit(1)
+        print("Bundles are up to date")
+        return
+
+    BUNDLE_DIR.mkdir(parents=True, exist_ok=True)
+    for name, entry in bundles.items():
+        (ROOT / name).write_text(entry["text"], encoding="utf-8")
+    for page in changed:
+        page.write_bytes(rewritten[page].encode("utf-8"))
+
+    # A run over some pages must not forget the bundles the other pages still load.
+    in_use = {name for names in bundle_references(every_page).values() for name in names} | set(bundles)
+    manifest = {**load_manifest(), **{name: entry["sources"] for name, entry in bundles.items()}}
+    manifest = {name: sources for name, sources in sorted(manifest.items()) if name in in_use}
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=1) + "\n", encoding="utf-8")
+    for path in BUNDLE_DIR.glob("*.js"):
+        if path.relative_to(ROOT).as_posix() not in in_use:
+            path.unlink()
+
+    report(bundles, before, {page: blocking_scripts(page) for page in pages}, notes)
+    if changed or stale:
+        print("Pages changed; run `python -m sitetools sw` to refresh the service worker's precache list.")
+
+
+def _gzip(data: bytes) -> int:
+    return len(zlib.compress(data, 6)) + 20
+
+
+def report(bundles: Dict[str, Dict], before: Dict[Path, List], after: Dict[Path, List], notes: List[str]) -> None:
+    for name, entry in bundles.items():
+        source_bytes = sum((ROOT / source).stat().st_size for source in entry["sources"])
+        data = entry["text"].encode("utf-8")
+        print(f"{name}: {' + '.join(entry['sources'])}")
+        print(
+            f"  {source_bytes / 1024:.1f} KB -> {len(data) / 1024:.1f} KB "
+            f"(gzip {sum(_gzip((ROOT / s).read_bytes()) for s in entry['sources']) / 1024:.1f} -> {_gzip(data) / 1024:.1f} KB), "
+            f"{len(entry['pages'])} pages, {len(entry['deferred'])} deferred"
+        )
+        for page, reasons in entry["blocked"].items():
+            print(f"  kept blocking on {page}: {'; '.join(reasons)}")
+
+    blocking_before = sum(len(scripts) for scripts in before.values())
+    blocking_after = sum(len(scripts) for scripts in after.values())
+    bytes_before = sum(size for scripts in before.values() for _, size in scripts)
+    bytes_after = sum(size for scripts in after.values() for _, size in scripts)
+    print(
+        f"\nRender-blocking scripts across {len(before)} pages: {blocking_before} -> {blocking_after} requests, "
+        f"{bytes_before / 1024:.0f} KB -> {bytes_after / 1024:.0f} KB (transfer size; third-party files estimated)"
+    )
+    remote = sorted({url for scripts in after.values() for url, _ in scripts if "://" in url})
+    if remote:
+        print(f"Still blocking (third-party, left alone): {', '.join(remote)}")
+
+    used = {source for entry in bundles.values() for source in entry["sources"]}
+    unused = sorted(p.relative_to(ROOT).as_posix() for p in (ROOT / "js").glob("*.js") if p.relative_to(ROOT).as_posix() not in used)
+    if unused:
+        print(f"Not loaded by any page: {', '.join(unused)}")
+    for note in notes:
+        print(note)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,672 @@
+"""Minify the site's HTML pages into an output directory, leaving the hand-written sources untouched.
+
+    python -m sitetools minify [PAGE ...] [-o _site] [--workers N] [--force]
+    python -m sitetools minify --verify [PAGE ...]
+
+Every transform is one the browser cannot tell apart from the original:
+
+- comments are dropped, except IE conditional comments;
+- runs of whitespace in text collapse to one space (or one newline if the run had one). Whitespace-only
+  text is removed only where the parent cannot render it (before the body, head, tables, selects);
+- `pre` and `textarea` contents are kept byte for byte. `class` lists are re-spaced; other attribute
+  values are kept as written;
+- optional closing tags (`</li>`, `</td>`, `</tr>`, `</option>`, ...) are dropped only when the element
+  is the one open and the very next token is a tag that would close it anyway;
+- inline `<style>` blocks and `style` attributes lose comments and insignificant whitespace;
+- inline scripts lose comments and have their whitespace collapsed. No renaming or rewriting. A line
+  break is removed only where automatic semicolon insertion could not have applied.
+
+Pages are minified in parallel. A manifest in the output directory records each page's source hash
+and the minifier's own hash, so unchanged pages are skipped on the next run.
+
+`--verify` checks the claim above. It runs the edge cases in JS_CASES and HTML_CASES (ASI, regex
+literals, templates, optional end tags, whitespace), then parses every page before and after minifying
+and compares the start tags and attributes, the text, and each inline script's tokens. Run it after
+changing this file.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sitetools import ROOT
+
+OUTPUT_DIR = ROOT / "_site"
+MANIFEST_NAME = ".minify.json"
+TOOL_DIGEST = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()[:12]  # any change here re-minifies every page
+
+TAG_RE = re.compile(
+    r"""<!--.*?-->|<![^>]*>|<\?[^>]*>|</?([a-zA-Z][^\s/>]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""",
+    re.S,
+)
+ATTR_RE = re.compile(r"""\s*([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'=<>`]+))?|\s*/""")
+CONDITIONAL_RE = re.compile(r"<!--\s*\[if|<!\[endif\]|<!--\s*<!\[endif\]", re.I)
+SPACE_RE = re.compile(r"[ \t\n\r\f]+")  # HTML whitespace only: never touch &nbsp; or U+00A0
+
+RAW_TEXT = {"script", "style", "pre", "textarea", "title"}
+VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Parents whose whitespace-only children are never rendered.
+NO_TEXT = {"html", "head", "table", "thead", "tbody", "tfoot", "tr", "colgroup", "select", "optgroup"}
+# Start tags that can come before the body; anything else (or visible text) starts the body, explicit or not.
+HEAD_TAGS = {"html", "head", "meta", "link", "title", "base", "script", "style", "noscript", "template"}
+JS_TYPES = {"", "text/javascript", "application/javascript", "module"}
+
+# end tag -> the tokens that may directly follow it for the tag to be omitted ("<x" start, "</x" end).
+P_CLOSERS = (
+    "address article aside blockquote details div dl fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6 "
+    "header hgroup hr main menu nav ol p pre section table ul"
+).split()
+OPTIONAL_END = {
+    "li": {"<li", "</ul", "</ol", "</menu"},
+    "dt": {"<dt", "<dd"},
+    "dd": {"<dt", "<dd", "</dl"},
+    "p": {f"<{name}" for name in P_CLOSERS},
+    "option": {"<option", "<optgroup", "</select", "</optgroup", "</datalist"},
+    "optgroup": {"<optgroup", "</select"},
+    "thead": {"<tbody", "<tfoot"},
+    "tbody": {"<tbody", "<tfoot", "</table"},
+    "tr": {"<tr", "</tbody", "</thead", "</tfoot", "</table"},
+    "td": {"<td", "<th", "</tr"},
+    "th": {"<td", "<th", "</tr"},
+    "head": {"<body"},
+}
+
+
+# --- CSS ---------------------------------------------------------------------------------------
+
+CSS_TOKEN_RE = re.compile(r"""/\*.*?\*/|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|\\.|[ \t\n\r\f]+|[^"'/\\ \t\n\r\f]+|.""", re.S)
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and whitespace that CSS ignores; strings and escapes are copied as-is."""
+    pieces: List[str] = []
+    for token in CSS_TOKEN_RE.findall(css):
+        if token.startswith("/*"):
+            token = " "  # a comment still separates tokens
+        if token.isspace():
+            if pieces and pieces[-1] != " ":
+                pieces.append(" ")
+            continue
+        quoted = token[0] in "\"'\\"
+        # Punctuation that never needs surrounding space. `:` only loses the space after it, since
+        # `a :hover` and `a:hover` are different selectors; `+`, `-`, `>` and `~` keep theirs for calc().
+        if pieces == [" "] or (pieces and pieces[-1] == " " and (pieces[-2][-1] in "{};,:" or token[0] in "{};,")):
+            pieces.pop()
+        if not quoted:
+            token = token.replace(";}", "}")
+            if token[0] == "}" and pieces and pieces[-1].endswith(";") and pieces[-1][0] not in "\"'\\":
+                pieces[-1] = pieces[-1][:-1]
+        pieces.append(token)
+    if pieces and pieces[-1] == " ":
+        pieces.pop()
+    return "".join(pieces)
+
+
+# --- JavaScript --------------------------------------------------------------------------------
+
+PAREN_KEYWORDS = {"if", "while", "for", "with"}  # `)` closing these conditions is followed by a statement
+REGEX_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await"}
+IDENT_RE = re.compile(r"[\w$\u0080-\uffff]+")
+JS_SPACE = " \t\n\r\f\v\u00a0\ufeff\u2028\u2029"
+LINE_BREAKS = "\n\r\u2028\u2029"
+# Characters after which a line break can go: no statement can end on them, so ASI never fires there.
+JOIN_AFTER = set("{([,;=:?&|<>*%^!~")
+# Characters a line break can come before: each continues the previous expression, so ASI never fires.
+JOIN_BEFORE = set("})],;:?.=&|<>*%^")
+# Within a line, a space next to one of these is never needed (not +, -, / or .).
+TIGHT = set("{}()[];,=<>!&|?:*%^~")
+UNSAFE_PAIRS = {"<!", "->", "</"}
+
+
+def _skip_string(src: str, i: int) -> int:
+    quote = src[i]
+    i += 1
+    while i < len(src) and src[i] not in (quote, "\n"):
+        i += 2 if src[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_template(src: str, i: int) -> int:
+    i += 1
+    while i < len(src):
+        char = src[i]
+        if char == "\\":
+            i += 2
+        elif char == "`":
+            return i + 1
+        elif src.startswith("${", i):
+            i = _skip_braces(src, i + 2)
+        else:
+            i += 1
+    return i
+
+
+def _skip_braces(src: str, i: int) -> int:
+    """Skip a `${ ... }` substitution, including any strings and templates nested in it."""
+    depth = 1
+    while i < len(src) and depth:
+        char = src[i]
+        if char in "'\"":
+            i = _skip_string(src, i)
+            continue
+        if char == "`":
+            i = _skip_template(src, i)
+            continue
+        depth += {"{": 1, "}": -1}.get(char, 0)
+        i += 1
+    return i
+
+
+def _skip_regex(src: str, i: int) -> int:
+    i += 1
+    in_class = False
+    while i < len(src) and src[i] != "\n":
+        char = src[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(src) and (src[i].isalnum() or src[i] == "$"):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def js_tokens(src: str) -> List[Tuple[str, str]]:
+    """Split a script into ("space" | "comment" | "code", text); strings, templates and regexes are code."""
+    tokens: List[Tuple[str, str]] = []
+    regex_ok = True  # whether a `/` here would start a regex literal rather than divide
+    openers: List[str] = []  # the code text before each open `(`
+    last = ""
+    i = 0
+    while i < len(src):
+        char = src[i]
+        start = i
+        if char in JS_SPACE:
+            while i < len(src) and src[i] in JS_SPACE:
+                i += 1
+            tokens.append(("space", src[start:i]))
+            continue
+        if src.startswith("//", i) or src.startswith("<!--", i):
+            end = src.find("\n", i)
+            i = len(src) if end < 0 else end
+            tokens.append(("comment", src[start:i]))
+            continue
+        if src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            i = len(src) if end < 0 else end + 2
+            tokens.append(("comment", src[start:i]))
+            continue
+        if char in "'\"":
+            i = _skip_string(src, i)
+        elif char == "`":
+            i = _skip_template(src, i)
+        elif char == "/" and regex_ok:
+            i = _skip_regex(src, i)
+        else:
+            match = IDENT_RE.match(src, i)
+            i = match.end() if match else i + 1
+        text = src[start:i]
+        tokens.append(("code", text))
+        if text == "(":
+            openers.append(last)
+        if text == ")":
+            # `if (x) /re/.test(y)`: after a statement's condition a `/` starts a regex; after `f(x)` it divides.
+            regex_ok = bool(openers) and openers.pop() in PAREN_KEYWORDS
+        else:
+            regex_ok = text[-1] in "(,=:[!&|?{};+-*%<>~^" or text in REGEX_KEYWORDS
+        last = text
+    return tokens
+
+
+def minify_js(src: str) -> str:
+    """Remove comments and collapse whitespace without changing how the script parses."""
+    out: List[str] = []
+    pending = ""  # whitespace (and comments) seen since the last code token
+    for kind, text in js_tokens(src):
+        if kind == "comment":
+            if text.startswith("/*!"):
+                out.append(pending + text)
+                pending = ""
+                continue
+            # `//` ends at a line break; a block comment with a line break counts as one for ASI.
+            pending += "\n" if "\n" in text or text.startswith(("//", "<!--")) else " "
+            continue
+        if kind == "space":
+            pending += text
+            continue
+        if out and pending:
+            out.append(_js_gap(out[-1][-1], text[0], pending))
+        pending = ""
+        out.append(text)
+    return "".join(out)
+
+
+def _js_gap(before: str, after: str, space: str) -> str:
+    """What to keep of the whitespace between two code tokens ending/starting with `before`/`after`."""
+    line_break = any(char in LINE_BREAKS for char in space)
+    # Joining must not spell an HTML comment or end tag, nor turn `1 .toFixed()` into `1.toFixed()`.
+    if before + after in UNSAFE_PAIRS or (after == "." and before.isdigit()):
+        return "\n" if line_break else " "
+    if line_break:
+        return "" if before in JOIN_AFTER or after in JOIN_BEFORE else "\n"
+    return "" if before in TIGHT or after in TIGHT else " "
+
+
+# --- HTML --------------------------------------------------------------------------------------
+
+
+def _attributes(body: str) -> Optional[str]:
+    """Re-serialise a start tag's attributes with single spaces; None if the tag is too odd to touch."""
+    parts: List[str] = []
+    pos = 0
+    self_closing = False
+    last_unquoted = False
+    while pos < len(body):
+        match = ATTR_RE.match(body, pos)
+        if match is None or match.end() == pos:
+            if body[pos:].strip():
+                return None
+            break
+        pos = match.end()
+        name, value = match.group(1), match.group(2)
+        if name is None:
+            self_closing = True  # HTML ignores a `/` that is not at the end, so only the last one counts
+            continue
+        self_closing = False
+        if value is None:
+            parts.append(f" {name}")
+            last_unquoted = False
+            continue
+        if value[0] in "\"'":
+            quote, inner = value[0], value[1:-1]
+            lowered = name.lower()
+            if lowered == "style":
+                inner = minify_css(inner)
+            elif lowered == "class":
+                inner = " ".join(SPACE_RE.split(inner.strip(" \t\n\r\f")))
+            value = quote + inner + quote
+            last_unquoted = False
+        else:
+            last_unquoted = True
+        parts.append(f" {name}={value}")
+    if self_closing:
+        parts.append(" /" if last_unquoted else "/")
+    return "".join(parts)
+
+
+def _tokens(html: str) -> List[Tuple[str, str, str]]:
+    """Split a page into (kind, text, lower-case tag name); raw-text element bodies stay whole."""
+    tokens: List[Tuple[str, str, str]] = []
+    pos = 0
+    while pos < len(html):
+        match = TAG_RE.search(html, pos)
+        if match is None:
+            tokens.append(("text", html[pos:], ""))
+            break
+        if match.start() > pos:
+            tokens.append(("text", html[pos : match.start()], ""))
+        text = match.group()
+        pos = match.end()
+        if text.startswith("<!--"):
+            tokens.append(("comment", text, ""))
+        elif text.startswith("<!") or text.startswith("<?"):
+            tokens.append(("doctype", text, ""))
+        elif text.startswith("</"):
+            tokens.append(("end", text, match.group(1).lower()))
+        else:
+            name = match.group(1).lower()
+            tokens.append(("start", text, name))
+            if name in RAW_TEXT and not text.endswith("/>"):
+                close = re.compile(rf"</{name}[\s/>]", re.I).search(html, pos)
+                end = close.start() if close else len(html)
+                tokens.append(("raw", html[pos:end], name))
+                pos = end
+    return tokens
+
+
+def _start_tag(text: str) -> str:
+    match = TAG_RE.fullmatch(text)
+    body = match.group(2) if match else None
+    if body is None:
+        return text
+    attributes = _attributes(body)
+    return text if attributes is None else f"<{match.group(1)}{attributes}>"
+
+
+def _script_type(start_tag: str) -> str:
+    match = re.search(r"""\stype\s*=\s*["']?([^"'\s>]*)""", start_tag, re.I)
+    return match.group(1).lower() if match else ""
+
+
+def minify_html(html: str) -> str:
+    tokens = [token for token in _tokens(html) if token[0] != "comment" or CONDITIONAL_RE.match(token[1])]
+    # Dropping a comment can leave two text tokens side by side; merge them so whitespace collapses once.
+    merged: List[Tuple[str, str, str]] = []
+    for token in tokens:
+        if token[0] == "text" and merged and merged[-1][0] == "text":
+            merged[-1] = ("text", merged[-1][1] + token[1], "")
+        else:
+            merged.append(token)
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_body = False
+    last_start = ""
+    for index, (kind, text, name) in enumerate(merged):
+        open_element = stack[-1] if stack else ""
+        parent = open_element or "html"
+        if parent == "html" and in_body:
+            parent = "body"  # text after the body has started is appended to it, with or without a <body> tag
+        if kind == "text":
+            blank = text.strip(" \t\n\r\f") == ""
+            if blank and (parent in NO_TEXT or index == len(merged) - 1):
+                continue
+            in_body = in_body or not blank
+            out.append(SPACE_RE.sub(lambda m: "\n" if "\n" in m.group() else " ", text))
+        elif kind == "raw":
+            if name == "style":
+                text = minify_css(text)
+            elif name == "script" and _script_type(last_start) in JS_TYPES and "src=" not in last_start.lower():
+                text = minify_js(text).strip()
+            elif name == "title":
+                text = SPACE_RE.sub(" ", text)
+            out.append(text)
+        elif kind == "start":
+            last_start = text
+            in_body = in_body or name not in HEAD_TAGS
+            out.append(_start_tag(text))
+            if name not in VOID and not text.endswith("/>"):
+                stack.append(name)
+        elif kind == "end":
+            if name in stack:
+                while stack and stack.pop() != name:
+                    pass
+            if open_element == name and _optional_end(name, merged, index):
+                continue
+            out.append(f"</{text[2:-1].strip()}>")
+        else:
+            out.append(text)
+    return "".join(out).strip(" \t\n\r\f")
+
+
+def _optional_end(name: str, tokens: List[Tuple[str, str, str]], index: int) -> bool:
+    if name in ("body", "html"):
+        return all(kind == "end" or (kind == "text" and not text.strip(" \t\n\r\f")) for kind, text, _ in tokens[index + 1 :])
+    followers = OPTIONAL_END.get(name)
+    if not followers or index + 1 >= len(tokens):
+        return False
+    kind, _, next_name = tokens[index + 1]
+    if kind == "start":
+        return f"<{next_name}" in followers
+    if kind == "end":
+        return f"</{next_name}" in followers
+    return False
+
+
+# --- Verification ------------------------------------------------------------------------------
+# `--verify` checks these (source, expected output) pairs and then every page. Run it after any change
+# to this file, i.e. whenever TOOL_DIGEST changes.
+
+JS_CASES = (
+    # Automatic semicolon insertion: these line breaks end (or deliberately do not end) a statement.
+    ("a = b\n(c || d).e()", "a=b\n(c||d).e()"),
+    ("return\nx", "return\nx"),
+    ("a\n++b", "a\n++b"),
+    ("i++\nj", "i++\nj"),
+    ("var a\nvar b", "var a\nvar b"),
+    ("a = b /*\n*/ c", "a=b\nc"),
+    # Joins that would change the tokens.
+    ("a + +b; c - -d; e - --f", "a + +b;c - -d;e - --f"),
+    ("x = 1 .toFixed()", "x=1 .toFixed()"),
+    ("x = 1\n-->y", "x=1\n-->y"),
+    # Regex literal or division, decided by what comes before the `/`.
+    ("if (x) /a  b/.test(y)", "if(x)/a  b/.test(y)"),
+    ("while (i--) /\\s  +/.test(s)", "while(i--)/\\s  +/.test(s)"),
+    ("n = f(x) / 2 / y", "n=f(x)/ 2 / y"),
+    ("r = [a, b].map(s => /x  y/.test(s))", "r=[a,b].map(s=>/x  y/.test(s))"),
+    # Strings, templates and comments.
+    ("s = `a  ${ b  +  `c ${ d }` }  e`", "s=`a  ${ b  +  `c ${ d }` }  e`"),
+    ("s = 'a  //  b' // comment\nt", "s='a  //  b'\nt"),
+    ("a = b /* c */ + d", "a=b + d"),
+    ("/*! keep */ a ( )", "/*! keep */ a()"),
+)
+
+HTML_CASES = (
+    # Optional end tags go only when the next token closes the element anyway.
+    ("<ul><li>a</li><li>b</li></ul>", "<ul><li>a<li>b</ul>"),
+    ("<table><tr><td>a</td><td>b</td></tr></table>", "<table><tr><td>a<td>b</table>"),
+    ("<select><option>a</option><option>b</option></select>", "<select><option>a<option>b</select>"),
+    ("<dl><dt>a</dt><dd>b</dd></dl>", "<dl><dt>a<dd>b</dl>"),
+    ("<p>a</p><div>b</div>", "<p>a<div>b</div>"),
+    ("<p>a</p><span>b</span>", "<p>a</p><span>b</span>"),
+    ("<ul><li><b>a</li><li>b</li></ul>", "<ul><li><b>a</li><li>b</ul>"),
+    ("<ul>\n  <li>a</li>\n  <li>b</li>\n</ul>", "<ul>\n<li>a</li>\n<li>b</li>\n</ul>"),
+    # Whitespace.
+    ("<b>a</b> <i>b</i>", "<b>a</b> <i>b</i>"),
+    ("<pre>  a\n   b  </pre>", "<pre>  a\n   b  </pre>"),
+    ("<textarea>  a  </textarea>", "<textarea>  a  </textarea>"),
+    ("<table>\n <tr>\n  <td>a</td>\n  <td>b</td>\n </tr>\n</table>", "<table><tr><td>a</td><td>b</td></tr></table>"),
+    ("<select> <option>a</option> <option>b</option> </select>", "<select><option>a</option><option>b</option></select>"),
+    ('<a title="  x  y ">t</a>', '<a title="  x  y ">t</a>'),
+    # Comments and inline styles.
+    ("<!--[if lt IE 9]><script src=x.js></script><![endif]--><!-- gone -->", "<!--[if lt IE 9]><script src=x.js></script><![endif]-->"),
+    ('<div style="color : red ;  margin: 0 ">x</div>', '<div style="color :red;margin:0">x</div>'),
+)
+
+
+# Where whitespace-only text cannot render. Spelled out again rather than reusing NO_TEXT and HEAD_TAGS,
+# so a mistake in those shows up as a difference instead of being repeated here.
+_OUTLINE_NO_TEXT = {"html", "head", "table", "thead", "tbody", "tfoot", "tr", "colgroup", "select", "optgroup"}
+_OUTLINE_HEAD = {"html", "head", "meta", "link", "title", "base", "script", "style", "noscript", "template"}
+CSS_WORD_RE = re.compile(r""""(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^\s"':;,{}()>+~]+|[:;,{}()>+~]""")
+
+
+def _outline_attributes(attrs: List[Tuple[str, Optional[str]]]) -> List[Tuple[str, object]]:
+    """Attributes as compared: `class` as its list of names, `style` as its CSS words without comments."""
+    out: List[Tuple[str, object]] = []
+    for name, value in attrs:
+        if value is not None and name == "class":
+            out.append((name, value.split()))
+        elif value is not None and name == "style":
+            out.append((name, CSS_WORD_RE.findall(re.sub(r"/\*.*?\*/", " ", value, flags=re.S))))
+        else:
+            out.append((name, value))
+    return out
+
+
+class _Outline(HTMLParser):
+    """What minifying must keep: every start tag with its attributes, the text with whitespace runs as one
+    space (and whitespace-only text wherever it can render), `pre`/`textarea` text exactly, and the code
+    tokens of each inline script."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.items: List[Tuple] = []
+        self._text: List[str] = []
+        self._stack: List[str] = []
+        self._in_body = False
+        self._script_js = False
+
+    def _flush(self) -> None:
+        text = "".join(self._text)
+        self._text = []
+        parent = self._stack[-1] if self._stack else ("body" if self._in_body else "html")
+        if parent == "script":
+            if self._script_js:
+                self.items.append(("script", [code for kind, code in js_tokens(text) if kind == "code"]))
+        elif parent != "style" and text:
+            if any(name in ("pre", "textarea") for name in self._stack):
+                self.items.append(("text", text))
+                return
+            text = SPACE_RE.sub(" ", text)
+            if text == " " and (parent in _OUTLINE_NO_TEXT or not self._in_body):
+                return
+            self.items.append(("text", text))
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush()
+        self.items.append(("start", tag, _outline_attributes(attrs)))
+        self._in_body = self._in_body or tag not in _OUTLINE_HEAD
+        if tag not in VOID:
+            self._stack.append(tag)
+        if tag == "script":
+            attributes = dict(attrs)
+            self._script_js = "src" not in attributes and (attributes.get("type") or "").lower() in JS_TYPES
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        self._flush()
+        self.items.append(("start", tag, _outline_attributes(attrs)))
+        self._in_body = self._in_body or tag not in _OUTLINE_HEAD
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in self._stack:
+            while self._stack.pop() != tag:
+                pass
+
+    def handle_data(self, data: str) -> None:
+        if not self._in_body and not self._stack and not self.items:
+            data = data.lstrip(" \t\n\r\f")  # minified pages start at their first tag
+        self._text.append(data)
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+        # Whitespace with only end tags after it is the end of the body and never renders.
+        while self.items and self.items[-1][0] == "text" and not self.items[-1][1].strip():
+            self.items.pop()
+        if self.items and self.items[-1][0] == "text":
+            self.items[-1] = ("text", self.items[-1][1].rstrip(" "))
+
+
+def outline(html: str) -> List[Tuple]:
+    parser = _Outline()
+    parser.feed(html)
+    parser.close()
+    return parser.items
+
+
+def verify(pages: List[Path]) -> List[str]:
+    """Failures of the cases above, and pages whose outline differs once minified (empty when all pass)."""
+    failures = []
+    for function, cases in ((minify_js, JS_CASES), (minify_html, HTML_CASES)):
+        for source, expected in cases:
+            got = function(source)
+            if got != expected:
+                failures.append(f"{function.__name__}({source!r}) gave {got!r}, expected {expected!r}")
+    for page in pages:
+        html = page.read_bytes().decode("utf-8")
+        before, after = outline(html), outline(minify_html(html))
+        if before != after:
+            index = next((i for i, pair in enumerate(zip(before, after)) if pair[0] != pair[1]), min(len(before), len(after)))
+            near = before[index] if index < len(before) else "end of page"
+            failures.append(f"{page.name}: differs after minifying, first at item {index} ({str(near)[:80]})")
+    return failures
+
+
+# --- Build -------------------------------------------------------------------------------------
+
+
+def _gzip_size(data: bytes) -> int:
+    return len(zlib.compress(data, 6)) + 20
+
+
+def minify_page(job: Tuple[Path, Path]) -> Dict:
+    source, target = job
+    data = source.read_bytes()
+    minified = minify_html(data.decode("utf-8")).encode("utf-8")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(minified)
+    return {
+        "sha1": hashlib.sha1(data).hexdigest(),
+        "tool": TOOL_DIGEST,
+        "bytes_before": len(data),
+        "bytes_after": len(minified),
+        "gzip_before": _gzip_size(data),
+        "gzip_after": _gzip_size(minified),
+    }
+
+
+def build(pages: List[Path], output_dir: Path = OUTPUT_DIR, workers: Optional[int] = None, force: bool = False) -> Dict[str, Dict]:
+    """Minify `pages` into `output_dir` (keeping their paths relative to the site root)."""
+    manifest_path = output_dir / MANIFEST_NAME
+    try:
+        manifest = {} if force else json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+
+    results: Dict[str, Dict] = {}
+    jobs = []
+    for page in pages:
+        name = page.relative_to(ROOT).as_posix()
+        target = output_dir / name
+        previous = manifest.get(name)
+        digest = hashlib.sha1(page.read_bytes()).hexdigest()
+        if previous and previous.get("sha1") == digest and previous.get("tool") == TOOL_DIGEST and target.is_file():
+            results[name] = {**previous, "skipped": True}
+        else:
+            jobs.append((name, page, target))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (name, *_), result in zip(jobs, pool.map(minify_page, [(page, target) for _, page, target in jobs])):
+                results[name] = result
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest.update({name: {k: v for k, v in entry.items() if k != "skipped"} for name, entry in results.items()})
+    manifest_path.write_text(json.dumps(dict(sorted(manifest.items())), indent=1))
+    return {name: results[name] for name in sorted(results)}
+
+
+def report(results: Dict[str, Dict]) -> None:
+    print(f"{'page':<30}{'KB before':>10}{'KB after':>10}{'saved':>8}{'gzip KB':>9}{'-> KB':>8}")
+    for name, entry in results.items():
+        saved = 1 - entry["bytes_after"] / entry["bytes_before"] if entry["bytes_before"] else 0
+        skipped = "  (unchanged)" if entry.get("skipped") else ""
+        print(
+            f"{name:<30}{entry['bytes_before'] / 1024:>10.1f}{entry['bytes_after'] / 1024:>10.1f}{saved:>8.0%}"
+            f"{entry['gzip_before'] / 1024:>9.1f}{entry['gzip_after'] / 1024:>8.1f}{skipped}"
+        )
+    before = sum(e["bytes_before"] for e in results.values())
+    after = sum(e["bytes_after"] for e in results.values())
+    gzip_before = sum(e["gzip_before"] for e in results.values())
+    gzip_after = sum(e["gzip_after"] for e in results.values())
+    if before:
+        print(
+            f"\n{len(results)} pages: {before / 1024:.0f} KB -> {after / 1024:.0f} KB ({1 - after / before:.0%} smaller), "
+            f"gzip {gzip_before / 1024:.0f} KB -> {gzip_after / 1024:.0f} KB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path, help="HTML pages (default: every top-level page)")
+    parser.add_argument("-o", "--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-minify pages the manifest says are unchanged")
+    parser.add_argument("--verify", action="store_true", help="check the built-in cases and every page's outline instead of writing")
+    args = parser.parse_args()
+    pages = [page.resolve() for page in args.pages] or sorted(ROOT.glob("*.html"))
+    if args.verify:
+        failures = verify(pages)
+        print("\n".join(failures) if failures else f"{len(JS_CASES) + len(HTML_CASES)} cases and {len(pages)} pages verified")
+        sys.exit(1 if failures else 0)
+    report(build(pages, args.output_dir.resolve(), args.workers, args.force))
+
+
+if __name__ == "__main__":
+    main()
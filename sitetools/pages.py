@@ -0,0 +1,217 @@
+"""Find the subresources a page requests: stylesheets, scripts, iframes, images and CSS `url()`s.
+
+`page_resources()` returns the page as a tree of `Resource`s. Each resource records what discovers it
+(its parent), whether it blocks first render, and how many bytes it costs on the wire. Local files are
+read from the working tree. Text is sized gzip-compressed, as GitHub Pages serves it. Remote files get
+a flat estimate.
+"""
+
+import re
+import zlib
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+from sitetools import ROOT
+
+SITE_ORIGIN = "site"
+TEXT_SUFFIXES = {".html", ".htm", ".css", ".js", ".svg", ".json", ".md", ".txt", ".xml"}
+REMOTE_BYTES = 50 * 1024  # assumed transfer size of third-party files we cannot read
+MISSING_BYTES = 512  # a 404 page
+
+# Lower fetches first: roughly Chrome's priorities for each kind of request.
+PRIORITY = {"document": 0, "stylesheet": 0, "script": 1, "font": 1, "iframe": 2, "async-script": 3, "image": 4, "icon": 5}
+
+CSS_URL_RE = re.compile(r"""@import\s+(?:url\()?\s*["']?([^"')\s;]+)|url\(\s*["']?([^"')]+?)["']?\s*\)""", re.I)
+FONT_SUFFIXES = {".woff", ".woff2", ".ttf", ".otf", ".eot"}
+
+
+class Resource:
+    """One request in a page's dependency tree."""
+
+    def __init__(self, url: str, kind: str, parent: Optional["Resource"] = None, blocking: bool = False) -> None:
+        self.url = url
+        self.kind = kind
+        self.parent = parent
+        self.blocking = blocking
+        self.children: List["Resource"] = []
+        self.path: Optional[Path] = None
+        self.origin = SITE_ORIGIN
+        self.bytes = REMOTE_BYTES
+        self.missing = False
+        self.requested: Set[Tuple[str, str]] = set()  # on the page root: every (origin, url) already fetched
+
+    @property
+    def priority(self) -> int:
+        return PRIORITY.get(self.kind, 4)
+
+    def walk(self) -> Iterator["Resource"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def __repr__(self) -> str:
+        return f"Resource({self.url!r}, {self.kind!r})"
+
+
+def transfer_size(path: Path) -> int:
+    data = path.read_bytes()
+    if path.suffix.lower() in TEXT_SUFFIXES:
+        return len(zlib.compress(data, 6)) + 20  # gzip framing
+    return len(data)
+
+
+def resolve(ref: str, base: Path) -> Tuple[Optional[str], Optional[Path]]:
+    """Map a reference to (origin, local path). Returns (None, None) for inline data: and script URLs."""
+    ref = ref.strip()
+    if not ref or ref.startswith(("data:", "javascript:", "mailto:", "#", "about:")):
+        return None, None
+    parts = urlsplit(ref if not ref.startswith("//") else "https:" + ref)
+    if parts.scheme in ("http", "https"):
+        return parts.netloc, None
+    path = unquote(parts.path)
+    target = ROOT / path.lstrip("/") if path.startswith("/") else base.parent / path
+    return SITE_ORIGIN, Path(_normalise(target))
+
+
+def _normalise(path: Path) -> str:
+    parts: List[str] = []
+    for part in path.as_posix().split("/"):
+        if part == "..":
+            if parts:
+                parts.pop()
+        elif part not in (".", ""):
+            parts.append(part)
+    return "/" + "/".join(parts)
+
+
+def _attach(parent: Resource, ref: str, kind: str, base: Path, blocking: bool = False) -> Optional[Resource]:
+    origin, path = resolve(ref, base)
+    if origin is None:
+        return None
+    root = parent
+    while root.parent is not None:
+        root = root.parent
+    key = (origin, str(path) if path is not None else ref)
+    if key in root.requested:
+        return None  # the browser reuses the first response (or the one already in flight)
+    root.requested.add(key)
+    resource = Resource(ref, kind, parent, blocking)
+    resource.origin = origin
+    if path is not None:
+        resource.path = path
+        if path.is_file():
+            resource.bytes = transfer_size(path)
+        else:
+            resource.bytes = MISSING_BYTES
+            resource.missing = True
+    parent.children.append(resource)
+    return resource
+
+
+def css_resources(parent: Resource, text: str, base: Path, seen: Dict[Path, Resource]) -> None:
+    """Add @import and url() references from CSS text; imported stylesheets are followed recursively."""
+    for match in CSS_URL_RE.finditer(text):
+        ref = match.group(1) or match.group(2)
+        if match.group(1):
+            child = _attach(parent, ref, "stylesheet", base, blocking=parent.blocking)
+            if child is not None and child.path is not None and not child.missing and child.path not in seen:
+                seen[child.path] = child
+                css_resources(child, child.path.read_text(encoding="utf-8", errors="replace"), child.path, seen)
+        else:
+            kind = "font" if Path(urlsplit(ref).path).suffix.lower() in FONT_SUFFIXES else "image"
+            _attach(parent, ref, kind, base)
+
+
+class PageParser(HTMLParser):
+    """Collect the fetches an HTML document triggers, in document order."""
+
+    def __init__(self, document: Resource, base: Path) -> None:
+        super().__init__(convert_charrefs=True)
+        self.document = document
+        self.base = base
+        self.in_head = True
+        self.in_style = False
+        self.noscript = 0
+        self.iframes: List[Resource] = []
+        self.stylesheets: List[Resource] = []
+        self.inline_css: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        attributes = {name: value or "" for name, value in attrs}
+        if tag == "body":
+            self.in_head = False
+        if tag == "noscript":
+            self.noscript += 1
+        if self.noscript:
+            return  # scripting is on, so <noscript> content is never fetched
+        if tag == "style":
+            self.in_style = True
+        if "style" in attributes:
+            self.inline_css.append(attributes["style"])
+
+        if attributes.get("loading") == "lazy":
+            return  # fetched only when scrolled near the viewport, so not part of the initial load
+
+        rel = attributes.get("rel", "").lower().split()
+        if tag == "link" and "stylesheet" in rel and attributes.get("href"):
+            blocking = attributes.get("media", "all") not in ("print", "none") and "disabled" not in attributes
+            resource = _attach(self.document, attributes["href"], "stylesheet", self.base, blocking)
+            if resource is not None:
+                self.stylesheets.append(resource)
+        elif tag == "link" and ("icon" in rel or "apple-touch-icon" in rel) and attributes.get("href"):
+            _attach(self.document, attributes["href"], "icon", self.base)
+        elif tag == "script" and attributes.get("src"):
+            deferred = "async" in attributes or "defer" in attributes or attributes.get("type") == "module"
+            kind = "async-script" if deferred else "script"
+            _attach(self.document, attributes["src"], kind, self.base, blocking=not deferred and self.in_head)
+        elif tag == "iframe" and attributes.get("src"):
+            resource = _attach(self.document, attributes["src"], "iframe", self.base)
+            if resource is not None:
+                self.iframes.append(resource)
+        elif tag in ("img", "input") and attributes.get("src"):
+            if tag == "img" or attributes.get("type") == "image":
+                _attach(self.document, attributes["src"], "image", self.base)
+        elif tag == "video" and attributes.get("poster"):
+            _attach(self.document, attributes["poster"], "image", self.base)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "noscript" and self.noscript:
+            self.noscript -= 1
+        elif tag == "style":
+            self.in_style = False
+        elif tag == "head":
+            self.in_head = False
+
+    def handle_data(self, data: str) -> None:
+        if self.in_style and not self.noscript:
+            self.inline_css.append(data)
+
+
+def page_resources(page: Path, parent: Optional[Resource] = None, depth: int = 0) -> Resource:
+    """Parse `page` (and, recursively, its iframes and stylesheets) into a Resource tree."""
+    if parent is None:
+        document = Resource(page.name, "document", blocking=True)
+        document.path = page
+        document.bytes = transfer_size(page)
+        document.requested.add((SITE_ORIGIN, str(page)))
+    else:
+        document = parent
+    parser = PageParser(document, page)
+    parser.feed(page.read_text(encoding="utf-8", errors="replace"))
+    parser.close()
+
+    seen: Dict[Path, Resource] = {}
+    for stylesheet in parser.stylesheets:
+        if stylesheet.path is not None and not stylesheet.missing and stylesheet.path not in seen:
+            seen[stylesheet.path] = stylesheet
+            css_resources(stylesheet, stylesheet.path.read_text(encoding="utf-8", errors="replace"), stylesheet.path, seen)
+    for css in parser.inline_css:
+        css_resources(document, css, page, seen)
+
+    for iframe in parser.iframes:
+        # Guard against pages that frame themselves (or each other) in a loop.
+        if iframe.path is not None and not iframe.missing and iframe.path.suffix.lower() in (".html", ".htm") and depth < 3:
+            page_resources(iframe.path, iframe, depth + 1)
+    return document
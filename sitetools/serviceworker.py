@@ -0,0 +1,194 @@
+"""Generate sw.js: a service worker that keeps the conference-day pages usable on overloaded venue Wi-Fi.
+
+    python -m sitetools sw [--check] [--max-image-kb 100]
+
+The precache list is the core pages (CORE_PAGES) plus every local stylesheet, script and font they load,
+and the icons and images under the size cap. Each entry carries a content hash. The worker then:
+
+- serves precached assets cache-first (each cached copy is keyed by its hash, so an edited file gets a
+  new entry instead of a stale hit);
+- serves HTML stale-while-revalidate: the cached page is shown at once and refreshed in the background
+  for the next visit. The runtime page cache is named after VERSION and older ones are dropped on
+  activate, so after a deploy a page falls back to its new precached revision (or the network) rather
+  than old HTML that loads files the deploy removed. Only .html/.md URLs, directories and extensionless
+  navigations count as pages, so downloads are not cached;
+- lets everything else (third-party scripts, large photos) go to the network untouched.
+
+The worker's VERSION is a hash of the manifest and the template. sw.js is rewritten only when that
+changes, so running the step on an unchanged tree is a no-op and browsers see no update.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from sitetools import ROOT
+from sitetools.pages import SITE_ORIGIN, page_resources
+
+OUTPUT_PATH = ROOT / "sw.js"
+CORE_PAGES = ("index.html", "program.html", "timetable.md", "location.html", "accommodation.html", "top_menu.html")
+PRECACHE_KINDS = {"document", "iframe", "stylesheet", "script", "async-script", "font", "icon", "image"}
+SMALL_IMAGE_BYTES = 100 * 1024
+VERSION_RE = re.compile(r'const VERSION = "([0-9a-f]+)";')
+
+TEMPLATE = """\
+// Generated by `python -m sitetools sw` from sitetools/serviceworker.py. Do not edit by hand.
+const VERSION = "__VERSION__";
+const PRECACHE = "ajcai-precache";
+const PAGES = "ajcai-pages-" + VERSION;
+const MANIFEST = __MANIFEST__;
+
+const scope = new URL(self.registration.scope);
+const revisioned = new Map(
+  MANIFEST.map((entry) => [new URL(entry.url, scope).pathname, new URL(entry.url, scope).href + "?__rev=" + entry.revision])
+);
+
+function precacheKey(url) {
+  let path = url.pathname;
+  if (path.endsWith("/")) path += "index.html";
+  return revisioned.get(path) || revisioned.get(path + ".html");
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE).then(async (cache) => {
+      const have = new Set((await cache.keys()).map((request) => request.url));
+      // Only fetch entries whose content changed since the last version.
+      const missing = [...revisioned.entries()].filter(([, key]) => !have.has(key));
+      await Promise.all(
+        missing.map(async ([path, key]) => {
+          const response = await fetch(path, { cache: "no-cache" });
+          if (response.ok) await cache.put(key, response);
+        })
+      );
+      await self.skipWaiting();
+    })
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE).then(async (cache) => {
+      const keep = new Set(revisioned.values());
+      for (const request of await cache.keys()) {
+        if (!keep.has(request.url)) await cache.delete(request);
+      }
+      // Pages cached by an older version may load files (e.g. hashed bundles) this one no longer has.
+      for (const name of await caches.keys()) {
+        if (name.startsWith("ajcai-pages") && name !== PAGES) await caches.delete(name);
+      }
+      await self.clients.claim();
+    })
+  );
+});
+
+function isPage(request, url) {
+  // Downloads (PDFs, archives) are navigations too, but must not fill the page cache.
+  if (url.pathname.endsWith("/") || /\\.(html?|md)$/.test(url.pathname)) return true;
+  return request.mode === "navigate" && !/\\.[^/]*$/.test(url.pathname);
+}
+
+async function staleWhileRevalidate(event, url) {
+  const pages = await caches.open(PAGES);
+  const key = url.origin + url.pathname;
+  const cached = (await pages.match(key)) || (await caches.match(precacheKey(url) || key));
+  const refresh = fetch(event.request)
+    .then((response) => {
+      if (response.ok) pages.put(key, response.clone());
+      return response;
+    })
+    .catch(() => cached);
+  if (cached) {
+    event.waitUntil(refresh);
+    return cached;
+  }
+  return refresh;
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== scope.origin) return;
+
+  if (isPage(request, url)) {
+    event.respondWith(staleWhileRevalidate(event, url));
+    return;
+  }
+  const key = precacheKey(url);
+  if (key) {
+    event.respondWith(caches.match(key).then((cached) => cached || fetch(request)));
+  }
+});
+"""
+
+
+def _revision(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:10]
+
+
+def precache_entries(pages=CORE_PAGES, max_image_bytes: int = SMALL_IMAGE_BYTES) -> List[Dict[str, str]]:
+    """Sorted {"url", "revision"} entries for the core pages and the local files they pull in."""
+    paths = set()
+    for name in pages:
+        page = ROOT / name
+        paths.add(page)
+        if page.suffix.lower() not in (".html", ".htm"):
+            continue
+        for resource in page_resources(page).walk():
+            if resource.origin != SITE_ORIGIN or resource.path is None or resource.missing:
+                continue
+            if resource.kind not in PRECACHE_KINDS:
+                continue
+            if resource.kind in ("image", "icon") and resource.path.stat().st_size > max_image_bytes:
+                continue
+            paths.add(resource.path)
+    return [
+        {"url": path.relative_to(ROOT).as_posix(), "revision": _revision(path)}
+        for path in sorted(paths)
+        if path.is_file() and ROOT in path.parents
+    ]
+
+
+def render(entries: List[Dict[str, str]]) -> str:
+    manifest = "[\n" + ",\n".join(f"  {json.dumps(entry)}" for entry in entries) + "\n]"
+    version = hashlib.sha1((manifest + TEMPLATE).encode("utf-8")).hexdigest()[:12]
+    return TEMPLATE.replace("__VERSION__", version).replace("__MANIFEST__", manifest)
+
+
+def current_version(path: Path = OUTPUT_PATH) -> str:
+    try:
+        match = VERSION_RE.search(path.read_text(encoding="utf-8"))
+    except OSError:
+        return ""
+    return match.group(1) if match else ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--max-image-kb", type=int, default=SMALL_IMAGE_BYTES // 1024, help="largest image to precache")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if the worker is out of date instead of writing it")
+    args = parser.parse_args()
+
+    entries = precache_entries(max_image_bytes=args.max_image_kb * 1024)
+    script = render(entries)
+    version = VERSION_RE.search(script).group(1)
+    total = sum((ROOT / entry["url"]).stat().st_size for entry in entries)
+    summary = f"{len(entries)} files, {total / 1024:.0f} KB precached, version {version}"
+
+    if current_version(args.output) == version:
+        print(f"{args.output.name} is up to date ({summary})")
+        return
+    if args.check:
+        print(f"{args.output.name} is out of date; run `python -m sitetools sw` ({summary})")
+        sys.exit(1)
+    args.output.write_text(script, encoding="utf-8")
+    print(f"Saved {args.output} ({summary})")
+
+
+if __name__ == "__main__":
+    main()
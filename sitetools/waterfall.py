@@ -0,0 +1,242 @@
+"""Offline page-load waterfall simulator.
+
+    python -m sitetools waterfall [PAGE ...] [--profile venue-wifi] [--bandwidth MBPS] [--rtt MS]
+                                  [--connections N] [--http2] [--details] [--json OUT]
+
+Each page is parsed into its request tree (see sitetools.pages), then loaded on a simple network
+model:
+
+- Every origin allows `connections` parallel requests, and each new connection pays `handshake` round
+  trips (TCP + TLS). With --http2 there is one connection per origin and no limit on concurrent streams.
+- A request costs one round trip to its first byte. After that, all responses in flight share the
+  bandwidth equally.
+- Subresources are discovered when their parent document or stylesheet has finished downloading, and
+  are requested in priority order (documents and CSS, then scripts and fonts, then images).
+
+The report gives, per page, the first-render estimate (the document plus its render-blocking CSS and
+head scripts), when the menu iframe is ready, the load time, the bytes transferred, and the critical
+path behind the load time. The model ignores TCP slow start, packet loss and script execution time,
+so the numbers are best compared with each other rather than read as absolute.
+"""
+
+import argparse
+import heapq
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sitetools import ROOT
+from sitetools.pages import SITE_ORIGIN, Resource, page_resources
+
+PROFILES = {
+    # Congested conference Wi-Fi: a few Mbit/s shared by everyone, long and variable round trips.
+    "venue-wifi": {"bandwidth": 2.0, "rtt": 300.0, "connections": 6},
+    "3g": {"bandwidth": 1.6, "rtt": 150.0, "connections": 6},
+    "4g": {"bandwidth": 9.0, "rtt": 85.0, "connections": 6},
+    "cable": {"bandwidth": 50.0, "rtt": 20.0, "connections": 6},
+}
+HANDSHAKE_RTTS = 2  # TCP + TLS 1.3
+
+
+class Network:
+    def __init__(self, bandwidth_mbps: float, rtt_ms: float, connections: int, http2: bool = False) -> None:
+        self.bytes_per_s = bandwidth_mbps * 1e6 / 8
+        self.rtt = rtt_ms / 1000
+        self.connections = connections
+        self.http2 = http2
+
+    def describe(self) -> str:
+        protocol = "HTTP/2" if self.http2 else f"HTTP/1.1 x{self.connections}"
+        return f"{self.bytes_per_s * 8 / 1e6:g} Mbit/s, RTT {self.rtt * 1000:g} ms, {protocol}"
+
+
+class _Origin:
+    def __init__(self) -> None:
+        self.idle = 0  # open connections with nothing in flight
+        self.open = 0
+        self.ready_at: Optional[float] = None  # HTTP/2: when the single connection finishes its handshake
+
+
+def simulate(document: Resource, network: Network) -> Dict[Resource, Dict[str, float]]:
+    """Load the tree and return {resource: {"queued", "start", "first_byte", "end"}} in seconds."""
+    timings: Dict[Resource, Dict[str, float]] = {}
+    origins: Dict[str, _Origin] = {}
+    queue: List[tuple] = []  # (priority, order, resource), per discovery
+    waiting: List[tuple] = []  # (first_byte, order, resource): request sent, no bytes yet
+    active: Dict[Resource, float] = {}  # bytes still to receive
+    order = 0
+    now = 0.0
+
+    def discover(resource: Resource) -> None:
+        nonlocal order
+        order += 1
+        timings[resource] = {"queued": now}
+        heapq.heappush(queue, (resource.priority, order, resource))
+
+    def dispatch() -> None:
+        held = []
+        while queue:
+            item = heapq.heappop(queue)
+            resource = item[2]
+            origin = origins.setdefault(resource.origin, _Origin())
+            if network.http2:
+                if origin.ready_at is None:
+                    origin.ready_at = now + HANDSHAKE_RTTS * network.rtt
+                sent = max(now, origin.ready_at)
+            elif origin.idle:
+                origin.idle -= 1
+                sent = now
+            elif origin.open < network.connections:
+                origin.open += 1
+                sent = now + HANDSHAKE_RTTS * network.rtt
+            else:
+                held.append(item)
+                continue
+            timings[resource]["start"] = now
+            heapq.heappush(waiting, (sent + network.rtt, item[1], resource))
+        for item in held:
+            heapq.heappush(queue, item)
+
+    discover(document)
+    dispatch()
+    while waiting or active:
+        share = network.bytes_per_s / len(active) if active else 0.0
+        next_finish = now + min(active.values()) / share if active else float("inf")
+        next_byte = waiting[0][0] if waiting else float("inf")
+        step = min(next_finish, next_byte) - now
+        for resource in active:
+            active[resource] -= share * step
+        now += step
+
+        while waiting and waiting[0][0] <= now + 1e-12:
+            _, _, resource = heapq.heappop(waiting)
+            timings[resource]["first_byte"] = now
+            active[resource] = float(resource.bytes)
+
+        for resource in [r for r, remaining in active.items() if remaining <= 1e-6]:
+            del active[resource]
+            timings[resource]["end"] = now
+            if not network.http2:
+                origins[resource.origin].idle += 1
+            for child in resource.children:
+                discover(child)
+        dispatch()
+    return timings
+
+
+def _own_blocking(document: Resource) -> List[Resource]:
+    """Render-blocking resources of `document` itself, not of the frames inside it."""
+    found = [document]
+    for child in document.children:
+        if child.kind != "iframe" and child.blocking:
+            found.extend(_own_blocking(child))
+    return found
+
+
+def _critical_path(resource: Resource) -> List[Resource]:
+    path = []
+    while resource is not None:
+        path.append(resource)
+        resource = resource.parent
+    return path[::-1]
+
+
+def analyse(page: Path, network: Network) -> Dict:
+    document = page_resources(page)
+    timings = simulate(document, network)
+    resources = list(document.walk())
+
+    blocking = _own_blocking(document)
+    render_gate = max(blocking, key=lambda r: timings[r]["end"])
+    last = max(resources, key=lambda r: timings[r]["end"])
+    frames = [r for r in resources if r.kind == "iframe"]
+    return {
+        "page": page.name,
+        "requests": len(resources),
+        "bytes": sum(r.bytes for r in resources),
+        "first_render": timings[render_gate]["end"],
+        "menu_ready": max((max(timings[r]["end"] for r in _own_blocking(f)) for f in frames), default=None),
+        "load": timings[last]["end"],
+        "blocking": [r.url for r in blocking[1:]],
+        "missing": sorted({r.url for r in resources if r.missing}),
+        "render_path": [r.url for r in _critical_path(render_gate)],
+        "critical_path": [r.url for r in _critical_path(last)],
+        "waterfall": [
+            {
+                "url": r.url,
+                "kind": r.kind,
+                "origin": r.origin,
+                "bytes": r.bytes,
+                "blocking": r.blocking,
+                **{key: round(value, 4) for key, value in timings[r].items()},
+            }
+            for r in sorted(resources, key=lambda r: (timings[r]["start"], timings[r]["end"]))
+        ],
+    }
+
+
+def _bar(start: float, end: float, total: float, width: int = 40) -> str:
+    left = int(start / total * width) if total else 0
+    length = max(1, int(round((end - start) / total * width))) if total else 1
+    return " " * left + "#" * min(length, width - left)
+
+
+def print_details(result: Dict) -> None:
+    total = result["load"]
+    print(f"\n{result['page']}: {result['requests']} requests, {result['bytes'] / 1024:.0f} KB")
+    for row in result["waterfall"]:
+        flag = "B" if row["blocking"] else " "
+        origin = "" if row["origin"] == SITE_ORIGIN else f" [{row['origin']}]"
+        print(f"  {row['start']:7.2f}s {row['end']:7.2f}s {flag} |{_bar(row['start'], row['end'], total):<40}| "
+              f"{row['bytes'] / 1024:6.1f} KB {row['kind']:<12} {row['url'][:60]}{origin}")
+    print(f"  first render via: {' -> '.join(result['render_path'])}")
+    print(f"  load via:         {' -> '.join(result['critical_path'])}")
+    if result["missing"]:
+        print(f"  missing locally:  {', '.join(result['missing'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path, help="HTML pages (default: every top-level page)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="venue-wifi")
+    parser.add_argument("--bandwidth", type=float, help="downlink in Mbit/s (overrides the profile)")
+    parser.add_argument("--rtt", type=float, help="round-trip time in ms (overrides the profile)")
+    parser.add_argument("--connections", type=int, help="parallel connections per origin (overrides the profile)")
+    parser.add_argument("--http2", action="store_true", help="one multiplexed connection per origin")
+    parser.add_argument("--details", action="store_true", help="print each page's waterfall and critical paths")
+    parser.add_argument("--json", dest="json_out", type=Path, help="write the full results as JSON")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    network = Network(
+        profile["bandwidth"] if args.bandwidth is None else args.bandwidth,
+        profile["rtt"] if args.rtt is None else args.rtt,
+        profile["connections"] if args.connections is None else args.connections,
+        args.http2,
+    )
+    # An explicit 0 RTT (a local server) is meaningful; zero bandwidth or connections never finishes a load.
+    if network.bytes_per_s <= 0 or network.rtt < 0 or network.connections < 1:
+        parser.error("--bandwidth and --connections must be positive and --rtt must not be negative")
+    pages = args.pages or sorted(ROOT.glob("*.html"))
+
+    print(f"Network: {network.describe()}")
+    print(f"{'page':<30}{'reqs':>6}{'KB':>8}{'blocking':>10}{'render s':>10}{'menu s':>8}{'load s':>8}")
+    results = []
+    for page in pages:
+        result = analyse(page.resolve(), network)
+        results.append(result)
+        menu = f"{result['menu_ready']:.2f}" if result["menu_ready"] is not None else "-"
+        print(
+            f"{result['page']:<30}{result['requests']:>6}{result['bytes'] / 1024:>8.0f}{len(result['blocking']):>10}"
+            f"{result['first_render']:>10.2f}{menu:>8}{result['load']:>8.2f}"
+        )
+    if args.details:
+        for result in results:
+            print_details(result)
+    if args.json_out:
+        args.json_out.write_text(json.dumps({"network": network.describe(), "pages": results}, indent=2))
+        print(f"Saved {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
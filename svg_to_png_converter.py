@@ -4,40 +4,11 @@ SVG to PNG Converter Script
 Converts SVG files to PNG format with specified dimensions
 """
 
-import os
 import sys
 from pathlib import Path
-import cairosvg
 import argparse
 
-def convert_svg_to_png(svg_path, png_path, width=None, height=None, dpi=300):
-    """
-    Convert SVG file to PNG format
-    
-    Args:
-        svg_path (str): Path to input SVG file
-        png_path (str): Path to output PNG file
-        width (int, optional): Width in pixels
-        height (int, optional): Height in pixels
-        dpi (int): DPI for output image (default: 300)
-    """
-    try:
-        # Read SVG content
-        with open(svg_path, 'r', encoding='utf-8') as f:
-            svg_content = f.read()
-        
-        # Convert SVG to PNG
-        cairosvg.svg2png(
-            bytestring=svg_content,
-            write_to=png_path,
-            output_width=width,
-            output_height=height,
-            dpi=dpi
-        )
-        print(f"✅ Converted: {svg_path} -> {png_path}")
-        
-    except Exception as e:
-        print(f"❌ Error converting {svg_path}: {str(e)}")
+from imaging.svg import convert_svg_to_png, require_cairosvg
 
 def batch_convert_svg_to_png(input_dir, output_dir, width=None, height=None, dpi=300):
     """
@@ -82,6 +53,11 @@ def main():
     parser.add_argument("--batch", action="store_true", help="Batch convert all SVG files in directory")
     
     args = parser.parse_args()
+    try:
+        require_cairosvg()
+    except ImportError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
     
     input_path = Path(args.input)
     
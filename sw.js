@@ -0,0 +1,103 @@
+// Generated by `python -m sitetools sw` from sitetools/serviceworker.py. Do not edit by hand.
+const VERSION = "e03981810b33";
+const PRECACHE = "ajcai-precache";
+const PAGES = "ajcai-pages-" + VERSION;
+const MANIFEST = [
+  {"url": "accommodation.html", "revision": "c0a6525146"},
+  {"url": "css/sub_common.css", "revision": "752ad909fe"},
+  {"url": "imgs/aba.jpg", "revision": "008f94fa7e"},
+  {"url": "imgs/asa.jpg", "revision": "c6bd759470"},
+  {"url": "imgs/favicons/favicon-180x180.png", "revision": "3de2d37354"},
+  {"url": "imgs/favicons/favicon-192x192.png", "revision": "6dd9e048f3"},
+  {"url": "imgs/favicons/favicon-32x32.png", "revision": "f3a887aba6"},
+  {"url": "imgs/qccw.jpg", "revision": "d323d48737"},
+  {"url": "imgs/qtc.webp", "revision": "e59dd497b1"},
+  {"url": "index.html", "revision": "266c9f9c85"},
+  {"url": "js/bundles/common.39857958f9.js", "revision": "39857958f9"},
+  {"url": "location.html", "revision": "dc48f7a209"},
+  {"url": "program.html", "revision": "e5bf8b194b"},
+  {"url": "timetable.md", "revision": "1107db1a05"},
+  {"url": "top_menu.html", "revision": "0125b9b79f"}
+];
+
+const scope = new URL(self.registration.scope);
+const revisioned = new Map(
+  MANIFEST.map((entry) => [new URL(entry.url, scope).pathname, new URL(entry.url, scope).href + "?__rev=" + entry.revision])
+);
+
+function precacheKey(url) {
+  let path = url.pathname;
+  if (path.endsWith("/")) path += "index.html";
+  return revisioned.get(path) || revisioned.get(path + ".html");
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE).then(async (cache) => {
+      const have = new Set((await cache.keys()).map((request) => request.url));
+      // Only fetch entries whose content changed since the last version.
+      const missing = [...revisioned.entries()].filter(([, key]) => !have.has(key));
+      await Promise.all(
+        missing.map(async ([path, key]) => {
+          const response = await fetch(path, { cache: "no-cache" });
+          if (response.ok) await cache.put(key, response);
+        })
+      );
+      await self.skipWaiting();
+    })
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.open(PRECACHE).then(async (cache) => {
+      const keep = new Set(revisioned.values());
+      for (const request of await cache.keys()) {
+        if (!keep.has(request.url)) await cache.delete(request);
+      }
+      // Pages cached by an older version may load files (e.g. hashed bundles) this one no longer has.
+      for (const name of await caches.keys()) {
+        if (name.startsWith("ajcai-pages") && name !== PAGES) await caches.delete(name);
+      }
+      await self.clients.claim();
+    })
+  );
+});
+
+function isPage(request, url) {
+  // Downloads (PDFs, archives) are navigations too, but must not fill the page cache.
+  if (url.pathname.endsWith("/") || /\.(html?|md)$/.test(url.pathname)) return true;
+  return request.mode === "navigate" && !/\.[^/]*$/.test(url.pathname);
+}
+
+async function staleWhileRevalidate(event, url) {
+  const pages = await caches.open(PAGES);
+  const key = url.origin + url.pathname;
+  const cached = (await pages.match(key)) || (await caches.match(precacheKey(url) || key));
+  const refresh = fetch(event.request)
+    .then((response) => {
+      if (response.ok) pages.put(key, response.clone());
+      return response;
+    })
+    .catch(() => cached);
+  if (cached) {
+    event.waitUntil(refresh);
+    return cached;
+  }
+  return refresh;
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== scope.origin) return;
+
+  if (isPage(request, url)) {
+    event.respondWith(staleWhileRevalidate(event, url));
+    return;
+  }
+  const key = precacheKey(url);
+  if (key) {
+    event.respondWith(caches.match(key).then((cached) => cached || fetch(request)));
+  }
+});